@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from users.models import User
+
+# Поля пользователя, которых хватает для проверки прав и подписи автора.
+# Пароль и код подтверждения в кэш не попадают.
+USER_CACHE_FIELDS = (
+    'id', 'username', 'role', 'is_active', 'is_superuser', 'is_staff'
+)
+
+
+def get_user_cache_key(user_id):
+    return f'api:user:{user_id}'
+
+
+def invalidate_user(user_id):
+    cache.delete(get_user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая берёт пользователя из кэша, а не из БД.
+
+    В кэше на JWT_USER_CACHE_TIMEOUT секунд хранятся только поля
+    USER_CACHE_FIELDS; остальные поля пользователя из кэша отложены
+    и читаются из БД при обращении. Запись удаляется из общего кэша при
+    сохранении или удалении пользователя (см. api.signals).
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        key = get_user_cache_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            user = super().get_user(validated_token)
+            cache.set(
+                key, [getattr(user, field) for field in USER_CACHE_FIELDS],
+                settings.JWT_USER_CACHE_TIMEOUT
+            )
+            return user
+        return User.from_db(DEFAULT_DB_ALIAS, USER_CACHE_FIELDS, values)
@@ -0,0 +1,100 @@
+"""Кэширование ответов каталога (категории, жанры, произведения)."""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from api.metrics import CACHE_REQUESTS
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_VERSION_KEY = 'api:catalog:version'
+
+
+class CacheStats:
+    """
+    Счётчики попаданий и промахов кэша по представлениям. Они же
+    отдаются в /metrics (yamdb_cache_requests_total).
+    """
+
+    def __init__(self):
+        self.hits = Counter()
+        self.misses = Counter()
+        self.lock = threading.Lock()
+
+    def hit(self, name):
+        with self.lock:
+            self.hits[name] += 1
+        CACHE_REQUESTS.inc(view=name, result='hit')
+
+    def miss(self, name):
+        with self.lock:
+            self.misses[name] += 1
+        CACHE_REQUESTS.inc(view=name, result='miss')
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                name: {'hits': self.hits[name], 'misses': self.misses[name]}
+                for name in set(self.hits) | set(self.misses)
+            }
+
+
+cache_stats = CacheStats()
+
+
+def new_catalog_version():
+    """
+    Версия - отметка времени в наносекундах, а не счётчик: если ключ
+    версии истёк или вытеснен из кэша, новая версия всё равно не совпадёт
+    ни с одной из прежних и старые ответы не будут прочитаны.
+    """
+    return time.time_ns()
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is not None:
+        return version
+    version = new_catalog_version()
+    cache.add(CATALOG_VERSION_KEY, version, timeout=None)
+    return cache.get(CATALOG_VERSION_KEY, version)
+
+
+def bump_catalog_version():
+    """
+    Сбрасывает все закэшированные ответы каталога сменой версии ключей:
+    старые записи просто перестают читаться и истекают по таймауту.
+    """
+    cache.set(CATALOG_VERSION_KEY, new_catalog_version(), timeout=None)
+
+
+def invalidate_catalog():
+    """Сбрасывает кэш каталога после фиксации текущей транзакции."""
+    transaction.on_commit(bump_catalog_version)
+
+
+def get_request_role(request):
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonymous'
+    if user.is_superuser:
+        return 'superuser'
+    return user.role
+
+
+def get_cache_key(request):
+    query = sorted(
+        (key, sorted(values)) for key, values in request.query_params.lists()
+    )
+    url = f'{request.get_host()}{request.path}?{query}'
+    return 'api:response:{version}:{role}:{digest}'.format(
+        version=get_catalog_version(),
+        role=get_request_role(request),
+        digest=hashlib.sha1(url.encode()).hexdigest(),
+    )
+
+
+def get_cache_timeout():
+    return getattr(settings, 'API_CACHE_TIMEOUT', 300)
@@ -0,0 +1,161 @@
+"""
+Быстрый путь сериализации списков только для чтения.
+
+План строится один раз по полям ModelSerializer: простые поля берутся
+из строк queryset.values() и приводятся методом to_representation поля,
+SlugRelatedField и вложенный сериализатор внешнего ключа - через JOIN
+в том же запросе, вложенный сериализатор ManyToMany - одним запросом
+на страницу. Результат совпадает с выводом сериализатора.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+class ValuesPlan:
+    """Описание того, как собрать ответ из строк values()."""
+
+    def __init__(self, model):
+        self.model = model
+        self.paths = {'pk'}
+        # (имя поля ответа, вид, данные) в порядке полей сериализатора.
+        self.entries = []
+
+    def add_column(self, name, path, convert=None):
+        self.paths.add(path)
+        self.entries.append((name, 'column', (path, convert)))
+
+    def add_nested(self, name, path, columns):
+        self.paths.add(path)
+        self.paths.update(column_path for _, column_path, _ in columns)
+        self.entries.append((name, 'nested', (path, columns)))
+
+    def add_many(self, name, model_field, columns):
+        self.entries.append((name, 'many', (model_field, columns)))
+
+    def values(self, queryset, *extra):
+        """Queryset строк values() с нужными плану и пагинации полями."""
+        return queryset.prefetch_related(None).values(
+            *sorted(self.paths.union(extra))
+        )
+
+    def fetch_many(self, model_field, columns, pks):
+        """Связанные объекты ManyToMany для страницы одним запросом."""
+        related = model_field.related_model
+        query_name = model_field.related_query_name()
+        rows = related.objects.filter(**{f'{query_name}__in': pks}).values(
+            query_name, *(path for _, path, _ in columns)
+        )
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[row[query_name]].append(convert_row(row, columns))
+        return grouped
+
+    def serialize(self, rows):
+        rows = list(rows)
+        pks = [row['pk'] for row in rows]
+        many = {}
+        for name, kind, data in self.entries:
+            if kind == 'many' and pks:
+                many[name] = self.fetch_many(*data, pks)
+        result = []
+        for row in rows:
+            item = {}
+            for name, kind, data in self.entries:
+                if kind == 'column':
+                    path, convert = data
+                    item[name] = represent(row[path], convert)
+                elif kind == 'nested':
+                    path, columns = data
+                    item[name] = (
+                        None if row[path] is None
+                        else convert_row(row, columns)
+                    )
+                else:
+                    item[name] = many[name].get(row['pk'], [])
+            result.append(item)
+        return result
+
+
+def represent(value, convert):
+    if convert is None or value is None:
+        return value
+    return convert(value)
+
+
+def convert_row(row, columns):
+    return {
+        name: represent(row[path], convert) for name, path, convert in columns
+    }
+
+
+def get_model_field(model, field):
+    """Поле модели, из которого читает поле сериализатора, или None."""
+    if field.source == '*' or '.' in field.source:
+        return None
+    try:
+        return model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        return None
+
+
+def compile_columns(model, fields, prefix=''):
+    """Простые поля сериализатора или None, если есть другие."""
+    columns = []
+    for name, field in fields.items():
+        if field.write_only:
+            continue
+        model_field = get_model_field(model, field)
+        if model_field is None or model_field.is_relation:
+            return None
+        columns.append((
+            name, prefix + field.source, field.to_representation
+        ))
+    return columns
+
+
+def compile_plan(model, fields):
+    """
+    План для полей сериализатора модели или None, если среди них есть
+    неподдерживаемые (методы, вычисляемые поля и т.п.).
+    """
+    plan = ValuesPlan(model)
+    for name, field in fields.items():
+        if field.write_only:
+            continue
+        model_field = get_model_field(model, field)
+        if model_field is None:
+            return None
+        source = field.source
+        if (
+            isinstance(field, serializers.ListSerializer)
+            and isinstance(field.child, serializers.ModelSerializer)
+            and model_field.many_to_many and model_field.concrete
+        ):
+            columns = compile_columns(
+                model_field.related_model, field.child.fields
+            )
+            if columns is None:
+                return None
+            plan.add_many(name, model_field, columns)
+        elif (
+            isinstance(field, serializers.ModelSerializer)
+            and model_field.many_to_one
+        ):
+            columns = compile_columns(
+                model_field.related_model, field.fields, f'{source}__'
+            )
+            if columns is None:
+                return None
+            plan.add_nested(name, source, columns)
+        elif (
+            isinstance(field, serializers.SlugRelatedField)
+            and model_field.many_to_one
+        ):
+            plan.add_column(name, f'{source}__{field.slug_field}')
+        elif not model_field.is_relation:
+            plan.add_column(name, source, field.to_representation)
+        else:
+            return None
+    return plan
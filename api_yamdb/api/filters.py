@@ -11,3 +11,4 @@ class TitleFilter(django_filters.FilterSet):
     class Meta:
         model = Title
         fields = '__all__'
+        exclude = ('search_vector', )
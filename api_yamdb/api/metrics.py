@@ -0,0 +1,411 @@
+"""
+Метрики в текстовом формате Prometheus (/metrics).
+
+Каждый процесс считает метрики у себя в памяти, без межпроцессных
+блокировок. Если задан METRICS_DIR, фоновый поток процесса раз
+в METRICS_FLUSH_INTERVAL секунд сохраняет изменившиеся значения в файл
+`<хост>-<pid>.json` этого каталога, последний раз - при завершении
+процесса. /metrics суммирует файлы всех процессов: воркеров gunicorn
+и обработчика очереди писем (mailer). Файлы завершившихся процессов того
+же хоста переносятся в общий файл archive.json, чтобы счётчики
+не уменьшались после перезапуска воркеров; перенос и чтение файлов идут
+под одной файловой блокировкой. Каталог следует очищать при перезапуске
+всего приложения.
+
+Адрес /metrics доступен с адресов METRICS_ALLOWED_IPS или с заголовком
+`Authorization: Bearer <METRICS_TOKEN>`.
+"""
+import atexit
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from api.profiling import get_view_tags
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0,
+    7.5, 10.0,
+)
+ARCHIVE_FILENAME = 'archive.json'
+LOCK_FILENAME = '.lock'
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace(
+        '"', r'\"'
+    )
+
+
+def format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join(
+        f'{name}="{escape(value)}"' for name, value in pairs
+    )
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, help_text, labels=()):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+
+    def key(self, labels):
+        return (self.name, tuple(
+            str(labels.get(label) or '') for label in self.labels
+        ))
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self.registry.add(self.key(labels), [amount])
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help_text, labels=(),
+                 buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        """Значения: счётчики по корзинам (не накопленные), сумма, число."""
+        values = [0] * (len(self.buckets) + 3)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                values[index] = 1
+                break
+        else:
+            values[len(self.buckets)] = 1
+        values[-2] = value
+        values[-1] = 1
+        self.registry.add(self.key(labels), values)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+class MetricsRegistry:
+    """Метрики процесса и их сбор из файлов всех процессов."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.values = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pid = os.getpid()
+        self.dirty = False
+        self.flusher_pid = None
+
+    def counter(self, name, help_text, labels=()):
+        self.metrics[name] = Counter(self, name, help_text, labels)
+        return self.metrics[name]
+
+    def histogram(self, name, help_text, labels=(), **kwargs):
+        self.metrics[name] = Histogram(self, name, help_text, labels, **kwargs)
+        return self.metrics[name]
+
+    def add(self, key, values):
+        with self.lock:
+            if os.getpid() != self.pid:
+                # Процесс - потомок после fork: значения родителя не его.
+                self.values = {}
+                self.pid = os.getpid()
+            current = self.values.get(key)
+            if current is None:
+                self.values[key] = list(values)
+            else:
+                for index, value in enumerate(values):
+                    current[index] += value
+            self.dirty = True
+            if self.flusher_pid != self.pid and settings.METRICS_DIR:
+                self.flusher_pid = self.pid
+                threading.Thread(target=self.flush_periodically,
+                                 daemon=True).start()
+
+    def flush_periodically(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            if self.dirty:
+                self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            if os.getpid() != self.pid:
+                return []
+            self.dirty = False
+            return [
+                [name, list(labels), list(values)]
+                for (name, labels), values in self.values.items()
+            ]
+
+    @property
+    def filename(self):
+        return f'{socket.gethostname()}-{os.getpid()}.json'
+
+    def flush(self):
+        """Сохраняет значения процесса в METRICS_DIR."""
+        path = settings.METRICS_DIR
+        if not path or os.getpid() != self.pid:
+            return
+        with self.flush_lock:
+            os.makedirs(path, exist_ok=True)
+            write_json(os.path.join(path, self.filename), self.snapshot())
+
+    def collect(self):
+        """Значения всех процессов: {(имя, метки): значения}."""
+        path = settings.METRICS_DIR
+        if not path:
+            return merge({}, self.snapshot())
+        self.flush()
+        totals = {}
+        with locked(path):
+            archive_dead_processes(path)
+            for filename in os.listdir(path):
+                if filename.endswith('.json'):
+                    merge(totals, read_json(os.path.join(path, filename)))
+        return totals
+
+    def render(self):
+        values = self.collect()
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for (name, labels), value in sorted(values.items()):
+                if name != metric.name:
+                    continue
+                pairs = list(zip(metric.labels, labels))
+                if metric.kind == 'counter':
+                    lines.append(
+                        f'{name}{format_labels(pairs)} '
+                        f'{format_value(value[0])}'
+                    )
+                    continue
+                cumulative = 0
+                for bound, count in zip(
+                    metric.buckets + (float('inf'), ), value
+                ):
+                    cumulative += count
+                    bucket = pairs + [('le', format_value(bound))]
+                    lines.append(
+                        f'{name}_bucket{format_labels(bucket)} {cumulative}'
+                    )
+                lines.append(
+                    f'{name}_sum{format_labels(pairs)} '
+                    f'{format_value(value[-2])}'
+                )
+                lines.append(
+                    f'{name}_count{format_labels(pairs)} {value[-1]}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+def merge(totals, rows):
+    for name, labels, values in rows:
+        key = (name, tuple(labels))
+        current = totals.get(key)
+        if current is None:
+            totals[key] = list(values)
+        elif len(current) == len(values):
+            for index, value in enumerate(values):
+                current[index] += value
+    return totals
+
+
+def read_json(path):
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return []
+
+
+def write_json(path, rows):
+    """Запись через временный файл: читатели не видят файл наполовину."""
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(rows, file)
+    os.replace(temporary, path)
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def locked(path):
+    with open(os.path.join(path, LOCK_FILENAME), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def archive_dead_processes(path):
+    """
+    Переносит значения завершившихся процессов этого хоста в архив.
+    Вызывается под блокировкой locked(path).
+    """
+    prefix = f'{socket.gethostname()}-'
+    dead = []
+    for filename in os.listdir(path):
+        pid = filename[len(prefix):-len('.json')]
+        if (
+            filename.startswith(prefix) and filename.endswith('.json')
+            and pid.isdigit() and not is_alive(int(pid))
+        ):
+            dead.append(os.path.join(path, filename))
+    if not dead:
+        return
+    archive = os.path.join(path, ARCHIVE_FILENAME)
+    totals = merge({}, read_json(archive))
+    for filename in dead:
+        merge(totals, read_json(filename))
+    write_json(archive, [
+        [name, list(labels), values]
+        for (name, labels), values in totals.items()
+    ])
+    for filename in dead:
+        os.remove(filename)
+
+
+registry = MetricsRegistry()
+# Значения, накопленные после последнего сохранения, - при выходе
+# процесса (в том числе воркера gunicorn).
+atexit.register(registry.flush)
+
+REQUEST_DURATION = registry.histogram(
+    'yamdb_http_request_duration_seconds', 'Время ответа на запрос.',
+    ('view', 'action', 'method', 'status')
+)
+REQUEST_BYTES = registry.counter(
+    'yamdb_http_request_bytes_total', 'Размер тел запросов в байтах.',
+    ('view', 'action')
+)
+RESPONSE_BYTES = registry.counter(
+    'yamdb_http_response_bytes_total', 'Размер тел ответов в байтах.',
+    ('view', 'action')
+)
+DB_QUERIES = registry.counter(
+    'yamdb_db_queries_total', 'Число SQL-запросов при обработке запросов.',
+    ('view', 'action')
+)
+CACHE_REQUESTS = registry.counter(
+    'yamdb_cache_requests_total',
+    'Обращения к кэшу ответов: result=hit или miss.', ('view', 'result')
+)
+EMAIL_ENQUEUE_DURATION = registry.histogram(
+    'yamdb_email_enqueue_duration_seconds',
+    'Время постановки письма с кодом подтверждения в очередь.'
+)
+EMAIL_SEND_DURATION = registry.histogram(
+    'yamdb_email_send_duration_seconds',
+    'Время отправки письма из очереди: result=sent или failed.',
+    ('result', )
+)
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def count_bytes(content, labels):
+    """Считает байты потокового ответа по мере отдачи."""
+    size = 0
+    try:
+        for chunk in content:
+            size += len(chunk)
+            yield chunk
+    finally:
+        RESPONSE_BYTES.inc(size, **labels)
+
+
+class MetricsMiddleware:
+    """Время, размеры и число SQL-запросов по представлениям и действиям."""
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        tags = get_view_tags(request)
+        labels = {'view': tags['view'], 'action': tags['action']}
+        REQUEST_DURATION.observe(
+            duration, method=request.method, status=response.status_code,
+            **labels
+        )
+        REQUEST_BYTES.inc(int(request.META.get('CONTENT_LENGTH') or 0),
+                          **labels)
+        DB_QUERIES.inc(counter.count, **labels)
+        if response.streaming:
+            response.streaming_content = count_bytes(
+                response.streaming_content, labels
+            )
+        else:
+            RESPONSE_BYTES.inc(len(response.content), **labels)
+        return response
+
+
+def is_allowed(request):
+    token = settings.METRICS_TOKEN
+    if token and constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return True
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        return HttpResponse(status=404)
+    if not is_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
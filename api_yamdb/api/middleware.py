@@ -0,0 +1,149 @@
+"""
+Сжатие ответов gzip или brotli (если установлен пакет Brotli).
+
+Сжимаются ответы с типом содержимого из COMPRESSION_CONTENT_TYPES
+размером от COMPRESSION_MIN_SIZE байт. Потоковые ответы сжимаются
+по частям: каждая часть сбрасывается клиенту сразу, не дожидаясь конца
+ответа.
+"""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self):
+        # wbits=31 - заголовок и контрольная сумма формата gzip.
+        self.compressor = zlib.compressobj(
+            settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31
+        )
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self):
+        self.compressor = brotli.Compressor(
+            quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+# В порядке предпочтения сервера при одинаковом q у клиента.
+COMPRESSORS = (BrotliCompressor, GzipCompressor) if brotli else (
+    GzipCompressor,
+)
+
+
+def parse_accept_encoding(header):
+    """Заголовок Accept-Encoding в виде {кодировка: q}."""
+    codings = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def get_compressor(header):
+    """Класс сжатия с наибольшим q у клиента или None."""
+    codings = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for compressor in COMPRESSORS:
+        quality = codings.get(compressor.encoding, codings.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = compressor, quality
+    return best
+
+
+def compress_sequence(compressor, sequence):
+    for data in sequence:
+        chunk = compressor.compress(data) + compressor.flush()
+        if chunk:
+            yield chunk
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Аналог django.middleware.gzip.GZipMiddleware с выбором кодировки
+    по Accept-Encoding, порогом размера и списком типов содержимого.
+    """
+
+    def is_compressible(self, response):
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if content_type.strip().lower() not in (
+            settings.COMPRESSION_CONTENT_TYPES
+        ):
+            return False
+        return response.streaming or (
+            len(response.content) >= settings.COMPRESSION_MIN_SIZE
+        )
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or (
+            not self.is_compressible(response)
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding', ))
+        compressor_class = get_compressor(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if compressor_class is None:
+            return response
+        compressor = compressor_class()
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                compressor, response.streaming_content
+            )
+            del response['Content-Length']
+        else:
+            compressed = (
+                compressor.compress(response.content) + compressor.finish()
+            )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сжатый ответ совпадает с несжатым только по смыслу.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = compressor.encoding
+        return response
@@ -0,0 +1,400 @@
+import hashlib
+import json
+import logging
+from contextlib import ExitStack
+
+from api.cache import cache_stats, get_cache_key, get_cache_timeout
+from api.fastpath import compile_plan
+from api.pagination import KeysetOrPageNumberPagination
+from api.profiling import MAX_SQL_LENGTH, RequestProfile, get_view_tags
+from api.renderers import FastJSONRenderer
+from api.streaming import get_streaming_response
+from api.utils import get_sparse_fields
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import Count, Max, Prefetch
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+logger = logging.getLogger('api.query_budget')
+
+
+def is_not_modified(request, etag, last_modified):
+    """
+    Проверяет заголовки If-None-Match и If-Modified-Since запроса
+    по ETag и времени изменения ответа (unix time или None).
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        # Слабое сравнение: сжатые ответы отдаются со слабым ETag.
+        etags = [
+            value[2:] if value.startswith('W/') else value
+            for value in parse_etags(if_none_match)
+        ]
+        return '*' in etags or etag in etags
+    if_modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+    )
+    return (
+        if_modified_since is not None
+        and last_modified is not None
+        and int(last_modified) <= if_modified_since
+    )
+
+
+class CachedListMixin:
+    """
+    Кэширует успешные ответы на list по адресу, параметрам запроса
+    и роли пользователя. Кэш сбрасывается при изменении данных
+    каталога (см. api.signals).
+
+    Вместе с данными кэшируются заголовки ETag и Last-Modified, так что
+    условный запрос к закэшированному ответу обходится без БД.
+    """
+    cached_headers = ('ETag', 'Last-Modified')
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        key = get_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            cache_stats.hit(self.basename)
+            data, headers = entry
+            last_modified = parse_http_date_safe(
+                headers.get('Last-Modified', '')
+            )
+            if 'ETag' in headers and is_not_modified(
+                request, headers['ETag'], last_modified
+            ):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = Response(data)
+            for header, value in headers.items():
+                response[header] = value
+            response['X-Cache'] = 'HIT'
+            return response
+        cache_stats.miss(self.basename)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and (
+            not response.streaming
+        ):
+            headers = {
+                header: response[header] for header in self.cached_headers
+                if response.has_header(header)
+            }
+            cache.set(key, (response.data, headers), get_cache_timeout())
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedResponseMixin(CachedListMixin):
+    """Кэширует ответы на list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка условных GET-запросов (If-None-Match, If-Modified-Since)
+    для list и retrieve.
+
+    Версия ответа вычисляется одним агрегатным запросом (количество
+    записей и время последнего изменения), и если клиент уже получал эту
+    версию, отдаётся 304 Not Modified без выборки и сериализации страницы.
+    """
+    modified_field = 'modified'
+
+    def get_object_queryset(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+    def get_conditional_response(self, queryset, handler, request,
+                                 *args, **kwargs):
+        version = queryset.order_by().aggregate(
+            count=Count('pk'), last_modified=Max(self.modified_field)
+        )
+        last_modified = version['last_modified']
+        etag = '"{}"'.format(hashlib.md5(
+            '{count}:{last_modified}:{path}:{media_type}'.format(
+                path=request.get_full_path(),
+                media_type=request.accepted_media_type,
+                **version
+            ).encode()
+        ).hexdigest())
+        timestamp = last_modified.timestamp() if last_modified else None
+        if is_not_modified(request, etag, timestamp):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            self.filter_queryset(self.get_queryset()),
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            self.get_object_queryset(),
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class FacetMixin:
+    """
+    Добавляет к ответу на list количество записей по значениям фасетов
+    для текущей отфильтрованной выборки: `?facets=genre,category`.
+
+    Фасеты описывает атрибут `facet_fields`: имя фасета -> {поле ответа:
+    путь к полю модели}. На каждый фасет выполняется один запрос
+    с GROUP BY по отфильтрованным id.
+    """
+    facet_fields = {}
+    facets_query_param = 'facets'
+
+    def get_requested_facets(self):
+        value = self.request.query_params.get(self.facets_query_param, '')
+        facets = [facet.strip() for facet in value.split(',') if facet.strip()]
+        unknown = [facet for facet in facets if facet not in self.facet_fields]
+        if unknown:
+            raise ValidationError({
+                self.facets_query_param:
+                    f'Неизвестные фасеты: {", ".join(unknown)}.'
+            })
+        return facets
+
+    def get_facet_counts(self, queryset, facet):
+        fields = self.facet_fields[facet]
+        model = queryset.model
+        groups = model.objects.filter(
+            pk__in=queryset.order_by().values('pk')
+        ).values(*fields.values()).annotate(
+            count=Count('pk', distinct=True)
+        ).order_by('-count', *fields.values())
+        return [
+            dict(
+                {name: group[path] for name, path in fields.items()},
+                count=group['count']
+            )
+            for group in groups
+            if any(group[path] is not None for path in fields.values())
+        ]
+
+    def get_query_budget(self):
+        budget = super().get_query_budget()
+        if budget is None or self.action != 'list':
+            return budget
+        return budget + len(getattr(self, 'requested_facets', ()))
+
+    def list(self, request, *args, **kwargs):
+        facets = self.requested_facets = self.get_requested_facets()
+        response = super().list(request, *args, **kwargs)
+        if facets and isinstance(response.data, dict):
+            queryset = self.filter_queryset(self.get_queryset())
+            response.data['facets'] = {
+                facet: self.get_facet_counts(queryset, facet)
+                for facet in facets
+            }
+        return response
+
+
+class SparseQuerysetMixin:
+    """
+    Сужает запрос под поля, оставленные в ответе `?fields=`/`?omit=`
+    (см. SparseFieldsMixin сериализаторов): выбирает через only() только
+    нужные столбцы и не подгружает связи исключённых полей.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        only, omit = get_sparse_fields(self.request)
+        if only is None and not omit:
+            return queryset
+        return self.narrow_queryset(queryset, self.get_serializer().fields)
+
+    def get_required_fields(self, queryset):
+        """Поля, без которых не обойтись: ключ и поля сортировки."""
+        ordering = tuple(queryset.query.order_by) + tuple(
+            getattr(self, 'keyset_ordering', None) or ()
+        )
+        return {queryset.model._meta.pk.name} | {
+            field.lstrip('-') for field in ordering
+            if isinstance(field, str) and '__' not in field
+        }
+
+    def narrow_queryset(self, queryset, fields):
+        opts = queryset.model._meta
+        columns = self.get_required_fields(queryset)
+        relations = set()
+        for field in fields.values():
+            if field.source == '*':
+                return queryset
+            name = field.source.split('.')[0]
+            try:
+                model_field = opts.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if model_field.is_relation:
+                relations.add(name)
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(name)
+        select_related = queryset.query.select_related
+        if isinstance(select_related, dict):
+            # select_related() без аргументов означает «все связи».
+            names = [name for name in select_related if name in relations]
+            queryset = queryset.select_related(None)
+            if names:
+                queryset = queryset.select_related(*names)
+        prefetches = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if (
+                lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+            ).split('__')[0] in relations
+        ]
+        return queryset.prefetch_related(None).prefetch_related(
+            *prefetches
+        ).only(*columns)
+
+
+class ValuesListMixin:
+    """
+    Отдаёт list из строк queryset.values() по плану api.fastpath, минуя
+    поля ModelSerializer. Включается настройкой API_FAST_SERIALIZATION;
+    если сериализатор содержит неподдерживаемые поля, строки
+    сериализуются как обычно.
+
+    Страницы больше API_STREAM_PAGE_SIZE отдаются потоком
+    (см. api.streaming).
+    """
+    values_plans = {}
+
+    def get_values_plan(self):
+        if not settings.API_FAST_SERIALIZATION:
+            return None
+        serializer = self.get_serializer()
+        key = (type(serializer), tuple(serializer.fields))
+        if key not in self.values_plans:
+            self.values_plans[key] = compile_plan(
+                serializer.Meta.model, serializer.fields
+            )
+        return self.values_plans[key]
+
+    def is_streamed(self):
+        renderer = self.request.accepted_renderer
+        return (
+            isinstance(self.paginator, KeysetOrPageNumberPagination)
+            and self.paginator.is_streamed(self.request)
+            and isinstance(renderer, FastJSONRenderer)
+            and renderer.can_stream(
+                self.request.accepted_media_type,
+                self.get_renderer_context()
+            )
+        )
+
+    def serialize_page(self, page):
+        return self.get_serializer(page, many=True).data
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_values_plan()
+        streamed = self.is_streamed()
+        if plan is None and not streamed:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        serialize = self.serialize_page
+        if plan is not None:
+            ordering = [
+                field.lstrip('-')
+                for field in getattr(self, 'keyset_ordering', None) or ()
+            ]
+            queryset = plan.values(queryset, *ordering)
+            serialize = plan.serialize
+        if streamed:
+            return get_streaming_response(self, queryset, serialize)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize(page))
+        return Response(serialize(queryset))
+
+
+class QueryBudgetError(Exception):
+    pass
+
+
+class QueryBudgetMixin:
+    """
+    Ограничивает число SQL-запросов на действие: `query_budget =
+    {'list': 4, 'retrieve': 3}`. Запросы аутентификации и проверки прав
+    в бюджет не входят, как и запросы при отдаче потокового ответа после
+    выхода из представления.
+
+    При QUERY_BUDGET_RAISE превышение бюджета - исключение
+    QueryBudgetError, иначе предупреждение в журнал `api.query_budget`
+    с текстами запросов.
+
+    Миксин ставится последним перед классом представления, чтобы
+    остальные миксины могли расширять бюджет через get_query_budget().
+    """
+    query_budget = {}
+
+    def get_query_budget(self):
+        return self.query_budget.get(self.action)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.get_query_budget() is None:
+            return
+        for connection in connections.all():
+            self.query_budget_stack.enter_context(
+                connection.execute_wrapper(self.query_profile)
+            )
+
+    def dispatch(self, request, *args, **kwargs):
+        self.query_profile = RequestProfile()
+        with ExitStack() as self.query_budget_stack:
+            return super().dispatch(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        budget = self.get_query_budget()
+        if budget is not None and len(self.query_profile.queries) > budget:
+            self.query_budget_exceeded(request, self.query_profile, budget)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def query_budget_exceeded(self, request, profile, budget):
+        tags = get_view_tags(request)
+        message = (
+            f'{tags["view"]}.{tags["action"]}: {len(profile.queries)} '
+            f'SQL-запросов при бюджете {budget}'
+        )
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetError('\n'.join(
+                [message] + [sql for sql, _ in profile.queries]
+            ))
+        logger.warning(json.dumps({
+            'event': 'query_budget_exceeded',
+            'method': request.method,
+            'path': request.path,
+            **tags,
+            'budget': budget,
+            'queries': len(profile.queries),
+            'duplicates': profile.duplicates(),
+            'sql': [sql[:MAX_SQL_LENGTH] for sql, _ in profile.queries],
+        }, ensure_ascii=False))
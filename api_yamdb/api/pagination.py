@@ -0,0 +1,144 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetOrPageNumberPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с возможностью перейти на курсорную (keyset).
+
+    Курсорный режим включается параметром `?pagination=cursor` или
+    переданным `?cursor=`. Порядок задаётся атрибутом `keyset_ordering`
+    у представления, последнее поле должно быть уникальным (обычно `id`).
+    Страница выбирается условием по значениям последней записи предыдущей
+    страницы, поэтому не нужны ни OFFSET, ни COUNT(*).
+
+    Размер страницы задаётся параметром `?page_size=` (не больше
+    API_MAX_PAGE_SIZE, а для администраторов - API_ADMIN_MAX_PAGE_SIZE).
+    С `lazy=True` paginate_queryset возвращает
+    невычисленный queryset страницы для потоковой отдачи.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def get_max_page_size(self, request):
+        user = request.user
+        if user.is_authenticated and (user.is_admin or user.is_superuser):
+            return settings.API_ADMIN_MAX_PAGE_SIZE
+        return settings.API_MAX_PAGE_SIZE
+
+    def get_page_size(self, request):
+        self.max_page_size = self.get_max_page_size(request)
+        return super().get_page_size(request)
+
+    def is_streamed(self, request):
+        """Страница больше API_STREAM_PAGE_SIZE отдаётся потоком."""
+        return (self.get_page_size(request) or 0) > (
+            settings.API_STREAM_PAGE_SIZE
+        )
+
+    def paginate_queryset(self, queryset, request, view=None, lazy=False):
+        self.ordering = getattr(view, 'keyset_ordering', None)
+        self.use_keyset = self.ordering is not None and (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+        if not self.use_keyset:
+            if lazy:
+                return self.paginate_lazily(queryset, request)
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(cursor))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        if lazy:
+            # Последняя запись страницы и есть ли следующая - одним
+            # запросом двух строк.
+            edge = list(queryset.values(
+                *(field.lstrip('-') for field in self.ordering)
+            )[page_size - 1:page_size + 1])
+            self.has_next = len(edge) > 1
+            self.last = edge[0] if edge else None
+            return queryset[:page_size]
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        del page[page_size:]
+        self.last = page[-1] if page else None
+        return page
+
+    def paginate_lazily(self, queryset, request):
+        """Как PageNumberPagination.paginate_queryset, но без list()."""
+        paginator = self.django_paginator_class(
+            queryset, self.get_page_size(request)
+        )
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        self.request = request
+        return self.page.object_list
+
+    def get_paginated_response(self, data):
+        if not self.use_keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.use_keyset:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = self.last[name] if isinstance(
+                self.last, dict
+            ) else getattr(self.last, name)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            values.append(value)
+        cursor = urlsafe_b64encode(
+            json.dumps(values).encode()
+        ).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_keyset_filter(self, cursor):
+        """
+        Строит условие «строго после курсора» для составного порядка:
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValueError('Курсор не соответствует порядку сортировки.')
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
@@ -0,0 +1,24 @@
+"""Быстрый JSON-парсер: orjson, если он установлен."""
+from api.renderers import FastJSONRenderer, orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser, разбирающий тело запроса через orjson. Тела в кодировке,
+    отличной от UTF-8, и строгий режим без NaN/Infinity разбирает
+    обычный JSONParser.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,135 @@
+"""
+Профилирование запросов: время ответа, время и число SQL-запросов,
+повторяющиеся запросы (N+1) по представлению и действию DRF.
+
+Включается настройкой PROFILING_ENABLED; выключенный слой не попадает
+в цепочку middleware. Профилируется доля PROFILING_SAMPLE_RATE запросов:
+каждый попадает в журнал `api.profiling` на уровне INFO, запросы дольше
+PROFILING_SLOW_REQUEST_MS - на уровне WARNING вместе с самыми долгими
+SQL-запросами. Записи журнала - JSON в одну строку.
+
+Запросы к БД, выполняемые при отдаче потокового ответа, уже после
+выхода из представления, не учитываются.
+"""
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('api.profiling')
+
+# Значения в SQL: списки параметров IN (%s, %s, ...), строки и числа.
+PLACEHOLDERS_RE = re.compile(r'%s(?:\s*,\s*%s)*')
+LITERALS_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+MAX_SQL_LENGTH = 1000
+
+
+def fingerprint(sql):
+    """SQL без значений: одинаковый у запросов, различающихся параметрами."""
+    return LITERALS_RE.sub('?', PLACEHOLDERS_RE.sub('?', sql))
+
+
+class RequestProfile:
+    """Собирает SQL-запросы запроса через connection.execute_wrapper."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    @property
+    def db_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self):
+        """Запросы, повторённые с разными параметрами, и их число."""
+        counts = Counter(fingerprint(sql) for sql, _ in self.queries)
+        return [
+            {'fingerprint': sql[:MAX_SQL_LENGTH], 'count': count}
+            for sql, count in counts.most_common() if count > 1
+        ]
+
+    def top_queries(self, limit):
+        return [
+            {'sql': sql[:MAX_SQL_LENGTH], 'ms': round(duration * 1000, 2)}
+            for sql, duration in sorted(
+                self.queries, key=lambda query: -query[1]
+            )[:limit]
+        ]
+
+
+def get_view_tags(request):
+    """Имя представления, действие DRF и имя маршрута запроса."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return {'view': None, 'action': None, 'url_name': None}
+    view = getattr(match.func, 'cls', match.func)
+    actions = getattr(match.func, 'actions', None) or {}
+    return {
+        'view': getattr(view, '__name__', repr(view)),
+        'action': actions.get(request.method.lower()),
+        'url_name': match.view_name,
+    }
+
+
+class ProfilingMiddleware:
+    """
+    Измеряет запросы и пишет результат в журнал, а время ответа и время
+    в БД - ещё и в заголовок Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        profile = RequestProfile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+        wall_time = time.perf_counter() - started
+        response['Server-Timing'] = (
+            f'db;dur={profile.db_time * 1000:.2f}, '
+            f'total;dur={wall_time * 1000:.2f}'
+        )
+        self.log(request, response, profile, wall_time)
+        return response
+
+    def log(self, request, response, profile, wall_time):
+        slow = wall_time * 1000 >= settings.PROFILING_SLOW_REQUEST_MS
+        level = logging.WARNING if slow else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        record = {
+            'event': 'slow_request' if slow else 'request',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **get_view_tags(request),
+            'wall_ms': round(wall_time * 1000, 2),
+            'db_ms': round(profile.db_time * 1000, 2),
+            'queries': len(profile.queries),
+            'duplicates': profile.duplicates(),
+        }
+        if slow:
+            record['top_queries'] = profile.top_queries(
+                settings.PROFILING_TOP_QUERIES
+            )
+        logger.log(level, json.dumps(record, ensure_ascii=False))
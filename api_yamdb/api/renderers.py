@@ -0,0 +1,119 @@
+"""
+Быстрый JSON-рендерер: orjson, если он установлен, иначе заранее
+созданный кодировщик стандартной библиотеки с настройками DRF.
+Рендереры форматов выгрузки таблиц (CSV, NDJSON).
+"""
+from rest_framework.compat import SHORT_SEPARATORS
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# U+2028 и U+2029 экранируются, как в JSONRenderer, чтобы ответ оставался
+# подмножеством JavaScript.
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+def default(obj):
+    """Типы, которые orjson не знает, кодируются как в DRF."""
+    return encoders.JSONEncoder().default(obj)
+
+
+class StreamedList:
+    """
+    Список в данных ответа, элементы которого приходят частями:
+    `chunks` - итерируемое из списков элементов.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer с тем же результатом, но без создания кодировщика на
+    каждый ответ. С отступами (`; indent=4`, Browsable API) работает
+    обычный JSONRenderer.
+    """
+    stdlib_encoder = encoders.JSONEncoder(
+        ensure_ascii=JSONRenderer.ensure_ascii,
+        allow_nan=not JSONRenderer.strict,
+        separators=SHORT_SEPARATORS,
+    )
+
+    def can_stream(self, accepted_media_type, renderer_context):
+        """Ответ кодируется этим рендерером, а не JSONRenderer."""
+        return self.compact and not self.ensure_ascii and self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ) is None
+
+    def encode(self, data):
+        if orjson is not None:
+            ret = orjson.dumps(data, default=default)
+        else:
+            ret = self.stdlib_encoder.encode(data).encode()
+        for char, escaped in LINE_SEPARATORS:
+            if char in ret:
+                ret = ret.replace(char, escaped)
+        return ret
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.can_stream(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return self.encode(data)
+
+    def render_stream(self, data):
+        """
+        Кодирует данные по частям, раскрывая StreamedList по мере
+        получения элементов. Склеенные части совпадают с render().
+        """
+        if isinstance(data, StreamedList):
+            yield b'['
+            first = True
+            for chunk in data.chunks:
+                if not chunk:
+                    continue
+                if not first:
+                    yield b','
+                yield self.encode(chunk)[1:-1]
+                first = False
+            yield b']'
+        elif isinstance(data, dict):
+            yield b'{'
+            for number, (key, value) in enumerate(data.items()):
+                yield (b',' if number else b'') + self.encode(key) + b':'
+                yield from self.render_stream(value)
+            yield b'}'
+        else:
+            yield self.encode(data)
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Рендерер для ответов, которые представление собирает само (потоковая
+    выгрузка таблиц): он нужен, чтобы согласование контента принимало
+    Accept с форматом выгрузки. Ошибки отдаются текстом из `detail`.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = data.get('detail', '')
+        return str(data).encode(self.charset)
+
+
+class CSVRenderer(PassthroughRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(PassthroughRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
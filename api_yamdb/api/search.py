@@ -0,0 +1,127 @@
+"""
+Полнотекстовый поиск по произведениям (название, описание) и отзывам.
+
+На PostgreSQL используются поля search_vector с GIN-индексами,
+на остальных СУБД (SQLite в тестах) - обратный индекс в памяти процесса,
+который перестраивается при изменении каталога.
+"""
+import math
+import re
+import threading
+from collections import defaultdict
+
+from api.cache import get_catalog_version
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import CharField, F, Value
+from reviews.models import Review, Title
+
+# Веса полей как у ts_rank по умолчанию: {D, C, B, A} = {0.1, 0.2, 0.4, 1}.
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class InvertedIndex:
+    """
+    Обратный индекс: слово -> {документ: суммарный вес вхождений}.
+
+    Документом считается пара (тип, id), результаты содержат те же поля,
+    что и поиск в PostgreSQL: kind, id, title_pk, snippet и rank.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.documents = {}
+
+    def add(self, kind, pk, title_pk, snippet, fields):
+        key = (kind, pk)
+        self.documents[key] = {
+            'kind': kind, 'id': pk, 'title_pk': title_pk, 'snippet': snippet,
+        }
+        for text, weight in fields:
+            for token in tokenize(text):
+                posting = self.postings[token]
+                posting[key] = posting.get(key, 0) + WEIGHTS[weight]
+
+    def search(self, query):
+        """Документы, содержащие все слова запроса, по убыванию tf-idf."""
+        postings = [
+            self.postings.get(token) for token in set(tokenize(query))
+        ]
+        if not postings or not all(postings):
+            return []
+        postings.sort(key=len)
+        keys = set(postings[0]).intersection(*postings[1:])
+        total = len(self.documents)
+        results = []
+        for key in keys:
+            rank = sum(
+                posting[key] * math.log(1 + total / len(posting))
+                for posting in postings
+            )
+            results.append(dict(self.documents[key], rank=rank))
+        results.sort(key=lambda result: (
+            -result['rank'], result['kind'], result['id']
+        ))
+        return results
+
+
+def build_index():
+    index = InvertedIndex()
+    for kind, model, title_field in (
+        ('title', Title, 'pk'), ('review', Review, 'title_id')
+    ):
+        fields = [field for field, _ in model.SEARCH_WEIGHTS]
+        weights = [weight for _, weight in model.SEARCH_WEIGHTS]
+        for pk, title_pk, *texts in model.objects.values_list(
+            'pk', title_field, *fields
+        ).iterator():
+            index.add(kind, pk, title_pk, texts[0], zip(texts, weights))
+    return index
+
+
+_index = {'version': None, 'index': None}
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Обратный индекс для текущей версии каталога."""
+    with _index_lock:
+        version = get_catalog_version()
+        if _index['index'] is None or _index['version'] != version:
+            _index.update(version=version, index=build_index())
+        return _index['index']
+
+
+def postgres_search(query):
+    """
+    Один запрос UNION по произведениям и отзывам, отсортированный
+    по ts_rank: пагинация применяет к нему LIMIT/OFFSET и COUNT(*).
+    """
+    query = SearchQuery(query, config=settings.SEARCH_CONFIG)
+    rank = SearchRank(F('search_vector'), query)
+    titles = Title.objects.filter(search_vector=query).annotate(
+        kind=Value('title', output_field=CharField()),
+        title_pk=F('pk'),
+        snippet=F('name'),
+        rank=rank,
+    ).values('kind', 'id', 'title_pk', 'snippet', 'rank').order_by()
+    reviews = Review.objects.filter(search_vector=query).annotate(
+        kind=Value('review', output_field=CharField()),
+        title_pk=F('title_id'),
+        snippet=F('text'),
+        rank=rank,
+    ).values('kind', 'id', 'title_pk', 'snippet', 'rank').order_by()
+    return titles.union(reviews, all=True).order_by('-rank', 'kind', 'id')
+
+
+def search(query):
+    """Найденные произведения и отзывы по убыванию релевантности."""
+    if connection.vendor == 'postgresql':
+        return postgres_search(query)
+    return get_index().search(query)
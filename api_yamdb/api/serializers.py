@@ -1,7 +1,8 @@
 import re
 
+from api.utils import get_sparse_fields
 from django.core.exceptions import ValidationError
-from django.db.models import Avg
+from django.utils.crypto import constant_time_compare
 from rest_framework import serializers
 from rest_framework.generics import get_object_or_404
 from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
@@ -9,38 +10,69 @@ from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Оставляет в ответе только поля из `?fields=` и убирает поля
+    из `?omit=`. Действует на сериализатор верхнего уровня (в том числе
+    на элементы списка), но не на вложенные сериализаторы.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = getattr(self, 'parent', None)
+        if parent is not None and not (
+            isinstance(parent, serializers.ListSerializer)
+            and parent.parent is None
+        ):
+            return fields
+        only, omit = get_sparse_fields(self.context.get('request'))
+        for name in list(fields):
+            if name in omit or (only is not None and name not in only):
+                del fields[name]
+        return fields
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         fields = ('name', 'slug')
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         fields = ('name', 'slug')
         model = Genre
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer(many=False, read_only=True)
     genre = GenreSerializer(many=True, required=True)
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+        )
         model = Title
 
-    def get_rating(self, obj):
-        return obj.reviews.aggregate(Avg('score'))['score__avg']
-
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         action = self.context['view'].action
-        if action not in ['list', 'retrieve']:
-            representation.pop('rating')
+        if action not in ['list', 'retrieve', 'top']:
+            representation.pop('rating', None)
         return representation
 
 
+class TitleTopSerializer(TitleSerializer):
+    """Произведение в рейтинге лучших."""
+    rating = serializers.FloatField(read_only=True)
+
+    class Meta(TitleSerializer.Meta):
+        fields = TitleSerializer.Meta.fields + (
+            'rating_count', 'weighted_rating'
+        )
+
+
 class TitleCreateSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         slug_field='slug',
@@ -53,11 +85,11 @@ class TitleCreateSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
         model = Title
 
 
-class AdminUserSerializer(serializers.ModelSerializer):
+class AdminUserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор Администратора."""
     username = serializers.CharField(
         max_length=150,
@@ -97,7 +129,7 @@ class AdminUserSerializer(serializers.ModelSerializer):
         return value
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор пользователя"""
     username = serializers.RegexField(
         r'^[\w.@+-]+\Z',
@@ -135,26 +167,24 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class ConfirmationCodeSerializer(serializers.ModelSerializer):
-    """Сериализатор получения кода подтверждения."""
+    """
+    Сериализатор получения кода подтверждения.
+
+    Проверяет только формат полей: уникальность username и email
+    проверяет SignUpViewSet одним запросом вместе с поиском пользователя.
+    """
     username = serializers.RegexField(
         r'^[\w.@+-]+\Z',
         max_length=150,
-        validators=[UniqueValidator(queryset=User.objects.all())]
     )
     email = serializers.EmailField(
         max_length=254,
-        validators=[UniqueValidator(queryset=User.objects.all())]
     )
 
     class Meta:
         fields = ('email', 'username')
         model = User
-        validators = [
-            UniqueTogetherValidator(
-                queryset=User.objects.all(),
-                fields=['username', 'email']
-            )
-        ]
+        validators = []
 
     def validate_username(self, value):
         if value.lower() == 'me':
@@ -176,19 +206,21 @@ class TokenSerializer(serializers.Serializer):
     )
 
     def validate(self, data):
-        user = get_object_or_404(User, username=data['username'])
-        user1 = User.objects.filter(
-            username=user.username,
-            confirmation_code=data['confirmation_code']
-        ).exists()
-        if not user1:
+        user = get_object_or_404(
+            User.objects.only('pk', 'confirmation_code'),
+            username=data['username']
+        )
+        if not user.confirmation_code or not constant_time_compare(
+            user.confirmation_code, data['confirmation_code']
+        ):
             raise serializers.ValidationError(
                 'Нет такого пользователя'
             )
+        data['user'] = user
         return data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
@@ -224,7 +256,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
@@ -237,3 +269,12 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """Результат полнотекстового поиска: произведение или отзыв."""
+    type = serializers.CharField(source='kind')
+    id = serializers.IntegerField()
+    title_id = serializers.IntegerField(source='title_pk')
+    text = serializers.CharField(source='snippet')
+    rank = serializers.FloatField()
@@ -0,0 +1,112 @@
+from api.authentication import invalidate_user
+from api.cache import invalidate_catalog
+from api.suggest import suggest_index
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+CATALOG_MODELS = (Category, Genre, Title, GenreTitle, Review)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def catalog_changed(sender, **kwargs):
+    """Изменения каталога и отзывов (они меняют рейтинг) сбрасывают кэш."""
+    if sender in CATALOG_MODELS:
+        invalidate_catalog()
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """
+    Убирает оценку удалённого отзыва из рейтинга произведения при любом
+    способе удаления: через API, админку или каскадом вместе с автором.
+    """
+    Title.objects.filter(pk=instance.title_id).change_rating(
+        -instance.score, -1
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, instance, reverse, pk_set,
+                         **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_catalog()
+        titles = Title.objects.filter(
+            pk__in=pk_set or () if reverse else (instance.pk, )
+        )
+        titles.update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """
+    Название и slug категории входят в ответы о произведениях: их
+    изменение обновляет время изменения произведений, а с ним ETag
+    и Last-Modified (см. ConditionalGetMixin).
+    """
+    Title.objects.filter(category=instance).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+    Title.objects.filter(genre=instance).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+def update_search_vector(sender, instance, update_fields, **kwargs):
+    """Пересчитывает поисковый вектор, если изменились индексируемые поля."""
+    fields = {field for field, _ in sender.SEARCH_WEIGHTS}
+    if update_fields is None or fields.intersection(update_fields):
+        sender.objects.filter(pk=instance.pk).update_search_vector()
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, update_fields, **kwargs):
+    if update_fields is None or 'name' in update_fields:
+        transaction.on_commit(
+            lambda: suggest_index.title_saved(instance.pk, instance.name)
+        )
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: suggest_index.title_deleted(pk))
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, update_fields, **kwargs):
+    if instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    username = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    instance.username_changed = (
+        username is not None and username != instance.username
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Изменённый пользователь (роль, активность) удаляется из кэша."""
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def username_changed(sender, instance, **kwargs):
+    """Имя автора входит в ответы об отзывах и комментариях."""
+    if getattr(instance, 'username_changed', False):
+        instance.username_changed = False
+        Review.objects.filter(author=instance).update(modified=timezone.now())
+        Comment.objects.filter(author=instance).update(modified=timezone.now())
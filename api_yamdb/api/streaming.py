@@ -0,0 +1,49 @@
+"""
+Потоковая отдача больших списков: строки читаются из БД итератором
+пачками, и каждая пачка кодируется и отправляется клиенту сразу, так что
+ответ целиком в памяти не собирается.
+"""
+from api.renderers import StreamedList
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from reviews.csv_data import chunked
+
+STREAM_CHUNK_SIZE = 200
+
+
+def iterate_chunks(queryset, serialize, size):
+    """
+    Данные ответа для строк queryset пачками по `size`. iterator()
+    не выполняет prefetch_related, поэтому связи подгружаются для каждой
+    пачки отдельно.
+    """
+    lookups = queryset._prefetch_related_lookups
+    for chunk in chunked(queryset.iterator(chunk_size=size), size):
+        if lookups:
+            prefetch_related_objects(chunk, *lookups)
+        yield serialize(chunk)
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """
+    Потоковый JSON-ответ. Как и у Response, данные доступны в `data`
+    до начала отдачи, и их можно дополнить (см. FacetMixin).
+    """
+
+    def __init__(self, data, renderer, status=None):
+        super().__init__(
+            renderer.render_stream(data), status=status,
+            content_type=renderer.media_type
+        )
+        self.data = data
+
+
+def get_streaming_response(view, queryset, serialize):
+    """Потоковый ответ со страницей queryset для представления DRF."""
+    page = view.paginator.paginate_queryset(
+        queryset, view.request, view=view, lazy=True
+    )
+    data = view.get_paginated_response(
+        StreamedList(iterate_chunks(page, serialize, STREAM_CHUNK_SIZE))
+    ).data
+    return StreamingJSONResponse(data, view.request.accepted_renderer)
@@ -0,0 +1,117 @@
+"""
+Подсказки названий произведений по префиксу.
+
+Названия хранятся в памяти процесса в отсортированном массиве, поиск
+по префиксу - двоичный поиск (bisect) и просмотр следующих элементов.
+Изменения произведений применяются к массиву по одному (см. api.signals),
+изменения из других процессов замечаются по версии в общем кэше,
+и индекс перестраивается целиком.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from reviews.models import Title
+
+SUGGEST_VERSION_KEY = 'api:suggest:version'
+
+
+class PrefixIndex:
+    """Отсортированный массив пар (название в нижнем регистре, id)."""
+
+    def __init__(self, titles=()):
+        self.names = dict(titles)
+        self.keys = sorted(
+            (name.casefold(), pk) for pk, name in self.names.items()
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, pk, name):
+        self.remove(pk)
+        self.names[pk] = name
+        insort(self.keys, (name.casefold(), pk))
+
+    def remove(self, pk):
+        name = self.names.pop(pk, None)
+        if name is not None:
+            del self.keys[bisect_left(self.keys, (name.casefold(), pk))]
+
+    def suggest(self, prefix, limit):
+        """Первые `limit` произведений с названием, начинающимся с prefix."""
+        prefix = prefix.casefold()
+        start = bisect_left(self.keys, (prefix, ))
+        results = []
+        for key, pk in self.keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            results.append({'id': pk, 'name': self.names[pk]})
+        return results
+
+
+class SuggestIndex:
+    """
+    Индекс подсказок процесса. Перестраивается, если версия в кэше
+    изменилась не этим процессом или индекс старше SUGGEST_INDEX_TTL.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index = None
+        self.version = None
+        self.built = 0
+
+    def get_version(self):
+        return cache.get_or_set(SUGGEST_VERSION_KEY, 1, timeout=None)
+
+    def is_stale(self):
+        return (
+            self.index is None
+            or self.version != self.get_version()
+            or time.monotonic() - self.built > settings.SUGGEST_INDEX_TTL
+        )
+
+    def rebuild(self):
+        self.version = self.get_version()
+        self.index = PrefixIndex(
+            Title.objects.values_list('pk', 'name').iterator()
+        )
+        self.built = time.monotonic()
+
+    def suggest(self, prefix, limit):
+        with self.lock:
+            if self.is_stale():
+                self.rebuild()
+            return self.index.suggest(prefix, limit)
+
+    def changed(self, update):
+        """
+        Применяет изменение к индексу процесса и сообщает остальным
+        процессам, что их индексы устарели.
+        """
+        try:
+            version = cache.incr(SUGGEST_VERSION_KEY)
+        except ValueError:
+            cache.add(SUGGEST_VERSION_KEY, 1, timeout=None)
+            version = None
+        with self.lock:
+            if self.index is None:
+                return
+            if version is None or version != self.version + 1:
+                # Версию успели поменять другие процессы.
+                self.index = None
+                return
+            update(self.index)
+            self.version = version
+
+    def title_saved(self, pk, name):
+        self.changed(lambda index: index.add(pk, name))
+
+    def title_deleted(self, pk):
+        self.changed(lambda index: index.remove(pk))
+
+
+suggest_index = SuggestIndex()
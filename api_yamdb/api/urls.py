@@ -1,7 +1,7 @@
 from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, SignUpViewSet, TitleViewSet, UserViewSet,
-                       token)
-from django.urls import include, path
+                       ReviewViewSet, SearchViewSet, SignUpViewSet,
+                       TitleViewSet, UserViewSet, export, token)
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -10,6 +10,7 @@ router.register(r'categories', CategoryViewSet, basename='categories')
 router.register(r'genres', GenreViewSet, basename='genres')
 router.register(r'users', UserViewSet, basename='users')
 router.register(r'auth/signup', SignUpViewSet)
+router.register(r'search', SearchViewSet, basename='search')
 router.register(
     r'titles/(?P<title_id>\d+)/reviews',
     ReviewViewSet,
@@ -29,5 +30,9 @@ auth_urls = [
 urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/auth/', include(auth_urls)),
-    path('v1/users/me/', UserViewSet, name="get_profile")
+    path('v1/users/me/', UserViewSet, name="get_profile"),
+    re_path(
+        r'^v1/export/(?P<table>\w+)\.(?P<file_format>csv|ndjson)$',
+        export, name='export'
+    ),
 ]
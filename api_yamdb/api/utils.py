@@ -1,27 +1,72 @@
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from api.metrics import EMAIL_ENQUEUE_DURATION
+from django.conf import settings
+from django.db import transaction
+from django.utils.crypto import get_random_string
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from users.models import OutgoingEmail
 
-from api_yamdb.settings import DEFAULT_FROM_EMAIL
+CONFIRMATION_CODE_LENGTH = 32
 
 
 def generate_confirmation_code(user):
-    return default_token_generator.make_token(user)
+    return get_random_string(CONFIRMATION_CODE_LENGTH)
 
 
+@EMAIL_ENQUEUE_DURATION.time()
 def send_email_with_verification_code(user):
+    """
+    Сохраняет новый код подтверждения и ставит письмо с ним в очередь.
+    Само письмо отправляет команда send_emails.
+    """
     user.confirmation_code = generate_confirmation_code(user)
-    user.save()
     email = user.email
     username = user.username
     confirmation_code = user.confirmation_code
-    send_mail(
-        subject='Письмо подтверждения',
-        from_email=DEFAULT_FROM_EMAIL,
-        recipient_list=[email, ],
-        message=(f'Привет, {username}! '
-                 'Это письмо содержит код подтверждения. Вот он:\n'
-                 f'<b>{confirmation_code}</b>.\n'
-                 'Чтоб получить токен, отправьте запрос\n'
-                 'с полями username и confirmation_code'
-                 'на /api/v1/auth/token/.'),
+    with transaction.atomic():
+        if user.pk is None:
+            user.save()
+        else:
+            user.save(update_fields=('confirmation_code', ))
+        OutgoingEmail.objects.create(
+            subject='Письмо подтверждения',
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient=email,
+            message=(f'Привет, {username}! '
+                     'Это письмо содержит код подтверждения. Вот он:\n'
+                     f'<b>{confirmation_code}</b>.\n'
+                     'Чтоб получить токен, отправьте запрос\n'
+                     'с полями username и confirmation_code'
+                     'на /api/v1/auth/token/.'),
+        )
+
+
+def get_positive_int(request, param, default, maximum=None):
+    """
+    Целый параметр запроса не меньше 1 и не больше maximum.
+    Нечисловое значение - ошибка валидации.
+    """
+    try:
+        value = max(int(request.query_params.get(param, default)), 1)
+    except ValueError:
+        raise ValidationError({param: 'Ожидается целое число.'})
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+
+def get_sparse_fields(request):
+    """
+    Поля ответа из параметров `?fields=` и `?omit=` (через запятую).
+    Возвращает пару (оставляемые поля или None, исключаемые поля);
+    учитывается только в запросах на чтение.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    params = request.query_params
+    only, omit = (
+        {name.strip() for name in params[param].split(',') if name.strip()}
+        if param in params else None
+        for param in ('fields', 'omit')
     )
+    return only, omit or set()
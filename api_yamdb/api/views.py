@@ -1,22 +1,43 @@
 from api.filters import TitleFilter
+from api.mixins import (CachedListMixin, CachedResponseMixin,
+                        ConditionalGetMixin, FacetMixin, QueryBudgetMixin,
+                        SparseQuerysetMixin, ValuesListMixin)
+from api.pagination import KeysetOrPageNumberPagination
 from api.permissions import (IsAdminOrSuperuserPermission, ReviewPermission,
                              TitlePermission)
+from api.renderers import CSVRenderer, NDJSONRenderer
+from api.search import search
 from api.serializers import (AdminUserSerializer, CategorySerializer,
                              CommentSerializer, ConfirmationCodeSerializer,
                              GenreSerializer, ReviewSerializer,
-                             TitleCreateSerializer, TitleSerializer,
+                             SearchResultSerializer, TitleCreateSerializer,
+                             TitleSerializer, TitleTopSerializer,
                              TokenSerializer, UserSerializer)
-from api.utils import send_email_with_verification_code
-from django.db.models import Avg
+from api.suggest import suggest_index
+from api.utils import get_positive_int, send_email_with_verification_code
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       renderer_classes)
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews import csv_data
 from reviews.models import Category, Genre, Review, Title
 from users.models import User
 
+# Таблицы, доступные для выгрузки через API: каталог, отзывы
+# и комментарии (без пользователей и их адресов почты).
+EXPORT_TABLES = [
+    table for table in csv_data.TABLES if table.model is not User
+]
+
 
 class CreateDestroyViewSet(
     mixins.CreateModelMixin,
@@ -27,22 +48,63 @@ class CreateDestroyViewSet(
     pass
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(
-        rating=Avg("reviews__score")
-    ).order_by("name")
+class TitleViewSet(CachedResponseMixin, ConditionalGetMixin, FacetMixin,
+                   ValuesListMixin, SparseQuerysetMixin, QueryBudgetMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.for_listing().order_by("name")
     serializer_class = TitleSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     permission_classes = (TitlePermission,)
+    pagination_class = KeysetOrPageNumberPagination
+    keyset_ordering = ('name', 'id')
+    query_budget = {'list': 4, 'retrieve': 3}
+    facet_fields = {
+        'genre': {'slug': 'genre__slug', 'name': 'genre__name'},
+        'category': {'slug': 'category__slug', 'name': 'category__name'},
+        'year': {'year': 'year'},
+    }
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleSerializer
+        if self.action == 'top':
+            return TitleTopSerializer
         return TitleCreateSerializer
 
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def top(self, request):
+        """
+        Лучшие произведения по взвешенному рейтингу. Принимает фильтры
+        списка (`genre`, `category`, `year`), `min_reviews` (по умолчанию 1)
+        и `limit` (по умолчанию 50, не больше 100).
+        """
+        return self.get_cached_response(self.get_top, request)
+
+    def get_top(self, request):
+        min_reviews = get_positive_int(request, 'min_reviews', 1)
+        limit = get_positive_int(request, 'limit', 50, maximum=100)
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            weighted_rating__isnull=False,
+            rating_count__gte=min_reviews,
+        ).order_by('-weighted_rating', 'id')[:limit]
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def suggest(self, request):
+        """
+        Подсказки названий: `?prefix=<начало названия>&limit=<до 50>`.
+        Отвечает из индекса в памяти, без запросов к БД.
+        """
+        prefix = request.query_params.get('prefix', '').strip()
+        if not prefix:
+            raise ValidationError({'prefix': 'Передайте начало названия.'})
+        limit = get_positive_int(request, 'limit', 10, maximum=50)
+        return Response(suggest_index.suggest(prefix, limit))
 
-class CategoryViewSet(CreateDestroyViewSet):
+
+class CategoryViewSet(CachedListMixin, SparseQuerysetMixin,
+                      CreateDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     filter_backends = (filters.SearchFilter,)
@@ -51,7 +113,8 @@ class CategoryViewSet(CreateDestroyViewSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(CreateDestroyViewSet):
+class GenreViewSet(CachedListMixin, SparseQuerysetMixin,
+                   CreateDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     filter_backends = (filters.SearchFilter,)
@@ -60,6 +123,28 @@ class GenreViewSet(CreateDestroyViewSet):
     lookup_field = 'slug'
 
 
+class SearchViewSet(CachedListMixin, mixins.ListModelMixin,
+                    viewsets.GenericViewSet):
+    """
+    Полнотекстовый поиск по произведениям и отзывам: `?q=<запрос>`.
+    Результаты отсортированы по релевантности.
+    """
+    serializer_class = SearchResultSerializer
+    permission_classes = (permissions.AllowAny,)
+    filter_backends = ()
+    search_query_param = 'q'
+
+    def get_queryset(self):
+        query = self.request.query_params.get(
+            self.search_query_param, ''
+        ).strip()
+        if not query:
+            raise ValidationError(
+                {self.search_query_param: 'Передайте поисковый запрос.'}
+            )
+        return search(query)
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """Работа с пользователями. Только для администратора."""
     queryset = User.objects.all()
@@ -93,7 +178,8 @@ class UserViewSet(viewsets.ModelViewSet):
         Профиль пользователя. Можно редактировать.
         Поле role редактирует только администратор.
         """
-        user = request.user
+        # Пользователь из кэша аутентификации содержит не все поля.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'POST':
             return Response(
                 {"detail": "Method Not Allowed"},
@@ -117,63 +203,128 @@ class SignUpViewSet(mixins.CreateModelMixin,
     permission_classes = (permissions.AllowAny,)
 
     def create(self, request, *args, **kwargs):
-        data = (request.data).dict()
-        user = User.objects.filter(**data)
-        serializer = ConfirmationCodeSerializer(data=data)
-        if user.exists():
-            send_email_with_verification_code(user.first())
-            return Response(serializer.initial_data, status=status.HTTP_200_OK)
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        user = User.objects.filter(**serializer.data)
-        send_email_with_verification_code(user.first())
+        username = serializer.validated_data['username']
+        email = serializer.validated_data['email']
+        try:
+            user = self.get_signup_user(username, email)
+            send_email_with_verification_code(user)
+        except IntegrityError:
+            # Пользователя с таким username или email успели создать
+            # параллельным запросом: отвечаем так же, как при повторе.
+            user = self.get_signup_user(username, email)
+            send_email_with_verification_code(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def get_signup_user(self, username, email):
+        """
+        Одним запросом ищет пользователя с переданными username и email.
+        Если их занимают другие пользователи, возвращает ошибку валидации,
+        если пользователя нет - новый несохранённый объект.
+        """
+        users = User.objects.filter(Q(username=username) | Q(email=email))
+        errors = {}
+        for user in users[:2]:
+            if user.username == username and user.email == email:
+                return user
+            if user.username == username:
+                errors['username'] = [UniqueValidator.message]
+            if user.email == email:
+                errors['email'] = [UniqueValidator.message]
+        if errors:
+            raise ValidationError(errors)
+        return User(username=username, email=email)
+
 
 @api_view(http_method_names=['POST', ])
 def token(request):
     """Выдает токен авторизации."""
     serializer = TokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    data = serializer.validated_data
-    user = get_object_or_404(User, **data)
-    refresh = RefreshToken.for_user(user)
+    access = AccessToken.for_user(serializer.validated_data['user'])
     return Response(
-        {'access': str(refresh.access_token)}, status=status.HTTP_201_CREATED
+        {'access': str(access)}, status=status.HTTP_201_CREATED
     )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, ValuesListMixin,
+                    SparseQuerysetMixin, QueryBudgetMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (ReviewPermission, )
+    pagination_class = KeysetOrPageNumberPagination
+    keyset_ordering = ('-pub_date', '-id')
+    query_budget = {'list': 4, 'retrieve': 3}
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title,
+                id=self.kwargs.get('title_id'))
+        return self._title
 
     def get_queryset(self):
-        title = get_object_or_404(
-            Title,
-            id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author')
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        title = get_object_or_404(
-            Title,
-            id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        title = self.get_title()
+        review = serializer.save(author=self.request.user, title=title)
+        Title.objects.filter(pk=title.pk).change_rating(review.score, 1)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_score = serializer.instance.score
+        review = serializer.save()
+        if review.score != old_score:
+            Title.objects.filter(pk=review.title_id).change_rating(
+                review.score - old_score, 0
+            )
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(ConditionalGetMixin, ValuesListMixin,
+                     SparseQuerysetMixin, QueryBudgetMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (ReviewPermission, )
+    pagination_class = KeysetOrPageNumberPagination
+    keyset_ordering = ('-pub_date', '-id')
+    query_budget = {'list': 4, 'retrieve': 3}
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get('review_id'),
+                title__id=self.kwargs.get('title_id'))
+        return self._review
 
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id'))
-        return review.comments.all()
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id'))
+        review = self.get_review()
         serializer.save(author=self.request.user, review=review)
+
+
+@api_view(http_method_names=['GET', ])
+@permission_classes((
+    permissions.IsAuthenticated, IsAdminOrSuperuserPermission,
+))
+@renderer_classes((
+    *api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer, NDJSONRenderer,
+))
+def export(request, table, file_format):
+    """Выгружает таблицу целиком потоком в CSV или NDJSON."""
+    table = csv_data.get_table(table, EXPORT_TABLES)
+    if table is None:
+        raise NotFound('Таблица не найдена.')
+    response = StreamingHttpResponse(
+        csv_data.export_table(table, file_format),
+        content_type=csv_data.EXPORT_FORMATS[file_format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{table.name}.{file_format}"'
+    )
+    return response
@@ -38,7 +38,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.profiling.ProfilingMiddleware',
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -83,6 +86,115 @@ DATABASES = {
 }
 
 
+# Cache
+
+# Кэш общий для всех воркеров gunicorn: через него сбрасываются ответы
+# каталога и пользователи из JWT-токенов.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', default='/var/tmp/yamdb_cache'
+        ),
+    }
+}
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+
+# Списки произведений, отзывов и комментариев собираются из values()
+# без полей ModelSerializer (см. api.fastpath).
+API_FAST_SERIALIZATION = os.getenv(
+    'API_FAST_SERIALIZATION', default='True'
+) == 'True'
+
+# Вес средней оценки по всем произведениям во взвешенном рейтинге
+# (сколько «виртуальных» отзывов с такой оценкой добавляется каждому).
+TOP_RATING_PRIOR_COUNT = int(os.getenv('TOP_RATING_PRIOR_COUNT', default=10))
+
+# Максимальный срок жизни индекса подсказок названий в памяти процесса.
+SUGGEST_INDEX_TTL = int(os.getenv('SUGGEST_INDEX_TTL', default=300))
+
+# Конфигурация полнотекстового поиска PostgreSQL (словарь и стемминг).
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', default='russian')
+
+# Размер страницы можно задать параметром `?page_size=` не больше
+# API_MAX_PAGE_SIZE (администраторам - API_ADMIN_MAX_PAGE_SIZE); страницы
+# больше API_STREAM_PAGE_SIZE отдаются потоком.
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', default=100))
+API_ADMIN_MAX_PAGE_SIZE = int(
+    os.getenv('API_ADMIN_MAX_PAGE_SIZE', default=10000)
+)
+API_STREAM_PAGE_SIZE = int(os.getenv('API_STREAM_PAGE_SIZE', default=500))
+
+# Сжатие ответов (api.middleware.CompressionMiddleware): типы содержимого,
+# минимальный размер в байтах и степень сжатия gzip и brotli.
+COMPRESSION_CONTENT_TYPES = os.getenv(
+    'COMPRESSION_CONTENT_TYPES',
+    default='application/json,text/csv,application/x-ndjson'
+).split(',')
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', default=1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', default=6))
+COMPRESSION_BROTLI_QUALITY = int(
+    os.getenv('COMPRESSION_BROTLI_QUALITY', default=5)
+)
+
+# Профилирование запросов (api.profiling.ProfilingMiddleware): доля
+# измеряемых запросов, порог медленного запроса в мс и число самых долгих
+# SQL-запросов в записи о медленном запросе.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', default='False') == 'True'
+PROFILING_SAMPLE_RATE = float(
+    os.getenv('PROFILING_SAMPLE_RATE', default=0.1)
+)
+PROFILING_SLOW_REQUEST_MS = float(
+    os.getenv('PROFILING_SLOW_REQUEST_MS', default=500)
+)
+PROFILING_TOP_QUERIES = int(os.getenv('PROFILING_TOP_QUERIES', default=5))
+
+# Метрики Prometheus (/metrics, api.metrics). METRICS_DIR - общий каталог
+# процессов (воркеров gunicorn и mailer), без него метрики только процесса,
+# отдающего /metrics.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', default='True') == 'True'
+METRICS_DIR = os.getenv('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = float(
+    os.getenv('METRICS_FLUSH_INTERVAL', default=1)
+)
+# Доступ к /metrics: с этих адресов или с заголовком
+# `Authorization: Bearer <METRICS_TOKEN>`.
+METRICS_ALLOWED_IPS = os.getenv(
+    'METRICS_ALLOWED_IPS', default='127.0.0.1,::1'
+).split(',')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
+# Превышение бюджета SQL-запросов представления (api.mixins.QueryBudgetMixin):
+# исключение при разработке и в тестах, предупреждение в журнал в работе.
+QUERY_BUDGET_RAISE = os.getenv(
+    'QUERY_BUDGET_RAISE', default=str(DEBUG)
+) == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.profiling': {
+            'handlers': ['console'],
+            'level': os.getenv('PROFILING_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+        'api.query_budget': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -137,11 +249,22 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+JWT_USER_CACHE_TIMEOUT = int(os.getenv('JWT_USER_CACHE_TIMEOUT', default=60))
+
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetOrPageNumberPagination',
     'PAGE_SIZE': 20,
 }
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db import transaction
 from reviews.models import Category, Comment, Genre, Review, Title
 
 
@@ -28,6 +29,7 @@ class TitleAdmin(admin.ModelAdmin):
                     'category',)
     search_fields = ('description',)
     list_filter = ('name', 'year')
+    readonly_fields = ('rating_sum', 'rating_count', 'rating')
     empty_value_display = '-пусто-'
 
 
@@ -44,6 +46,19 @@ class ReviewAdmin(admin.ModelAdmin):
     list_filter = ('title', 'pub_date')
     empty_value_display = '-пусто-'
 
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        titles = Title.objects.filter(pk=obj.title_id)
+        if change and 'title' in form.changed_data:
+            titles |= Title.objects.filter(pk=form.initial['title'])
+        super().save_model(request, obj, form, change)
+        if not change:
+            titles.change_rating(obj.score, 1)
+        elif 'title' in form.changed_data:
+            titles.recalculate_rating()
+        elif 'score' in form.changed_data:
+            titles.change_rating(obj.score - form.initial['score'], 0)
+
 
 class CommentAdmin(admin.ModelAdmin):
     list_display = (
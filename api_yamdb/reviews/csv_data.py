@@ -0,0 +1,408 @@
+"""
+Описание CSV-файлов с данными (static/data/), их пакетная загрузка
+и выгрузка в том же виде.
+"""
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+
+class CSVTable:
+    """
+    CSV-файл и модель, в которую он загружается.
+
+    `columns` сопоставляет заголовки столбцов файла с атрибутами модели,
+    для внешних ключей это `<поле>_id`.
+    """
+
+    def __init__(self, filename, model, columns):
+        self.filename = filename
+        self.model = model
+        self.columns = columns
+
+    def __repr__(self):
+        return f'<CSVTable {self.filename}>'
+
+    @property
+    def name(self):
+        return os.path.splitext(self.filename)[0]
+
+    @property
+    def foreign_keys(self):
+        """Атрибуты внешних ключей и модели, на которые они ссылаются."""
+        return {
+            field.attname: field.related_model
+            for field in self.model._meta.concrete_fields
+            if field.is_relation and field.attname in self.columns.values()
+        }
+
+    def build(self, row):
+        """Создаёт несохранённый объект модели из строки файла."""
+        values = {}
+        for column, attname in self.columns.items():
+            value = row[column]
+            if value == '' and self.model._meta.get_field(attname).null:
+                value = None
+            values[attname] = value
+        return self.model(**values)
+
+
+TABLES = (
+    CSVTable('category.csv', Category, {
+        'id': 'id', 'name': 'name', 'slug': 'slug',
+    }),
+    CSVTable('genre.csv', Genre, {
+        'id': 'id', 'name': 'name', 'slug': 'slug',
+    }),
+    CSVTable('users.csv', User, {
+        'id': 'id', 'username': 'username', 'email': 'email', 'role': 'role',
+        'bio': 'bio', 'first_name': 'first_name', 'last_name': 'last_name',
+    }),
+    CSVTable('titles.csv', Title, {
+        'id': 'id', 'name': 'name', 'year': 'year',
+        'category': 'category_id',
+    }),
+    CSVTable('genre_title.csv', GenreTitle, {
+        'id': 'id', 'title_id': 'title_id', 'genre_id': 'genre_id',
+    }),
+    CSVTable('review.csv', Review, {
+        'id': 'id', 'title_id': 'title_id', 'text': 'text',
+        'author': 'author_id', 'score': 'score', 'pub_date': 'pub_date',
+    }),
+    CSVTable('comments.csv', Comment, {
+        'id': 'id', 'review_id': 'review_id', 'text': 'text',
+        'author': 'author_id', 'pub_date': 'pub_date',
+    }),
+)
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def get_table(name, tables=TABLES):
+    """Таблица по имени файла без расширения (`review`) или None."""
+    for table in tables:
+        if table.name == name:
+            return table
+    return None
+
+
+@contextmanager
+def keep_auto_now(model):
+    """
+    Отключает auto_now_add у полей модели, чтобы сохранить даты из файла:
+    bulk_create, в отличие от loaddata, не умеет сохранять «как есть».
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def read_rows(path):
+    """Построчно читает CSV-файл, не загружая его в память целиком."""
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        yield from csv.DictReader(file)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_load(table, rows, batch_size=1000, check_parents=True):
+    """
+    Загружает строки в таблицу пачками через bulk_create в одной транзакции.
+
+    Строки, ссылающиеся на отсутствующие в БД записи, пропускаются;
+    для проверки id родительских таблиц загружаются в память, поэтому
+    для заведомо согласованных данных её можно выключить
+    (`check_parents=False`). Уже существующие записи не перезаписываются.
+    Возвращает количество вставленных строк (по разнице числа записей
+    до и после загрузки) и пропущенных строк.
+    """
+    parent_ids = {
+        attname: set(model.objects.values_list('pk', flat=True))
+        for attname, model in table.foreign_keys.items()
+    } if check_parents else {}
+    processed = 0
+    with transaction.atomic(), keep_auto_now(table.model):
+        before = table.model.objects.count()
+        for chunk in chunked(rows, batch_size):
+            objs = []
+            for row in chunk:
+                obj = table.build(row)
+                if all(
+                    getattr(obj, attname) is None
+                    or int(getattr(obj, attname)) in ids
+                    for attname, ids in parent_ids.items()
+                ):
+                    objs.append(obj)
+            table.model.objects.bulk_create(
+                objs, batch_size=batch_size, ignore_conflicts=True
+            )
+            processed += len(chunk)
+        loaded = table.model.objects.count() - before
+    return loaded, processed - loaded
+
+
+def reset_sequences(models):
+    """Сдвигает автоинкремент за максимальный загруженный id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def get_missing_value(field):
+    """Значение для поля модели, которого нет в CSV-файле."""
+    if getattr(field, 'auto_now', False) or getattr(
+        field, 'auto_now_add', False
+    ):
+        return timezone.now()
+    return field.get_default()
+
+
+def copy_load(table, path):
+    """
+    Загружает файл в PostgreSQL через COPY FROM STDIN.
+
+    Файл копируется во временную таблицу из текстовых столбцов, строки
+    с несуществующими родителями удаляются, остальные переносятся в
+    таблицу модели одним INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+    Поля модели, которых нет в файле, получают значения по умолчанию.
+    Возвращает количество вставленных и пропущенных строк.
+    """
+    opts = table.model._meta
+    quote = connection.ops.quote_name
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        header = next(csv.reader(file))
+    fields = [opts.get_field(table.columns[column]) for column in header]
+    staging = quote(f'staging_{opts.db_table}')
+    staging_columns = ', '.join(quote(column) for column in header)
+    missing = [
+        field for field in opts.concrete_fields
+        if field not in fields and not field.primary_key
+    ]
+    selects = []
+    for column, field in zip(header, fields):
+        value = f's.{quote(column)}'
+        if field.null:
+            value = f"NULLIF({value}, '')"
+        selects.append(f'{value}::{field.cast_db_type(connection)}')
+    orphans = []
+    for column, field in zip(header, fields):
+        if field.is_relation:
+            parent = field.related_model._meta
+            orphans.append(
+                f"(s.{quote(column)} <> '' AND NOT EXISTS ("
+                f'SELECT 1 FROM {quote(parent.db_table)} p '
+                f'WHERE p.{quote(parent.pk.column)} = '
+                f's.{quote(column)}::{field.cast_db_type(connection)}))'
+            )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE {staging} '
+            f'({", ".join(f"{quote(column)} text" for column in header)}) '
+            f'ON COMMIT DROP'
+        )
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            cursor.copy_expert(
+                f'COPY {staging} ({staging_columns}) FROM STDIN '
+                f'WITH (FORMAT csv, HEADER true)',
+                file
+            )
+        cursor.execute(f'SELECT COUNT(*) FROM {staging}')
+        total, = cursor.fetchone()
+        if orphans:
+            cursor.execute(
+                f'DELETE FROM {staging} s WHERE {" OR ".join(orphans)}'
+            )
+        columns = [field.column for field in fields + missing]
+        cursor.execute(
+            f'INSERT INTO {quote(opts.db_table)} '
+            f'({", ".join(quote(column) for column in columns)}) '
+            f'SELECT {", ".join(selects + ["%s"] * len(missing))} '
+            f'FROM {staging} s ON CONFLICT DO NOTHING',
+            [get_missing_value(field) for field in missing]
+        )
+        loaded = cursor.rowcount
+        cursor.execute(f'DROP TABLE {staging}')
+    return loaded, total - loaded
+
+
+def dependency_levels(tables):
+    """
+    Раскладывает таблицы по уровням графа внешних ключей моделей:
+    таблицы одного уровня не зависят друг от друга и могут загружаться
+    одновременно, каждая следующая ссылается только на предыдущие.
+    """
+    by_model = {table.model: table for table in tables}
+    depends = {
+        table: {
+            by_model[model] for model in table.foreign_keys.values()
+            if model in by_model and model is not table.model
+        }
+        for table in tables
+    }
+    levels = []
+    loaded = set()
+    while depends:
+        level = [table for table, parents in depends.items()
+                 if parents <= loaded]
+        if not level:
+            raise ValueError(
+                f'Циклическая зависимость между таблицами: {list(depends)}'
+            )
+        levels.append(level)
+        loaded.update(level)
+        for table in level:
+            del depends[table]
+    return levels
+
+
+def load_table(table, path, batch_size):
+    """Загружает один файл и возвращает число строк и время загрузки."""
+    started = time.monotonic()
+    if connection.vendor == 'postgresql':
+        loaded, skipped = copy_load(table, path)
+    else:
+        loaded, skipped = bulk_load(table, read_rows(path), batch_size)
+    return loaded, skipped, time.monotonic() - started
+
+
+def load_table_in_thread(table, path, batch_size):
+    """Загружает файл в отдельном потоке со своим соединением с БД."""
+    try:
+        return load_table(table, path, batch_size)
+    finally:
+        connection.close()
+
+
+def load_tables(path, batch_size=1000, stdout=None, tables=TABLES,
+                workers=1):
+    """
+    Загружает все файлы из каталога `path` в порядке зависимостей.
+
+    Независимые таблицы загружаются параллельно в `workers` потоках.
+    На PostgreSQL используется COPY, на остальных СУБД (SQLite в тестах) -
+    последовательная загрузка пачками через bulk_create.
+    """
+    if connection.vendor != 'postgresql':
+        workers = 1
+    tables = [
+        table for table in tables
+        if os.path.exists(os.path.join(path, table.filename))
+    ]
+    levels = dependency_levels(tables)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for level in levels:
+            if workers > 1 and len(level) > 1:
+                results = [
+                    executor.submit(
+                        load_table_in_thread, table,
+                        os.path.join(path, table.filename), batch_size
+                    )
+                    for table in level
+                ]
+                results = [future.result() for future in results]
+            else:
+                results = [
+                    load_table(
+                        table, os.path.join(path, table.filename), batch_size
+                    )
+                    for table in level
+                ]
+            for table, (loaded, skipped, elapsed) in zip(level, results):
+                if stdout is not None:
+                    stdout.write(
+                        f'{table.filename}: {loaded} строк за '
+                        f'{elapsed:.2f} с '
+                        f'({loaded / max(elapsed, 1e-6):.0f} строк/с), '
+                        f'пропущено {skipped}'
+                    )
+    reset_sequences([table.model for table in tables])
+
+
+def format_datetime(value):
+    """Дата в виде, как в файлах: 2019-09-24T21:08:21.567Z."""
+    text = value.isoformat(
+        timespec='microseconds' if value.microsecond % 1000
+        else 'milliseconds'
+    )
+    if text.endswith('+00:00'):
+        return text[:-6] + 'Z'
+    return text
+
+
+def to_csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    return value
+
+
+def to_json_value(value):
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    return value
+
+
+def export_table(table, file_format='csv', chunk_size=1000):
+    """
+    Выгружает таблицу частями по `chunk_size` строк: в CSV с теми же
+    столбцами, что и файл static/data/, или в NDJSON (объект на строку).
+
+    Строки читаются через iterator() (на PostgreSQL - курсором на стороне
+    сервера), поэтому память не зависит от размера таблицы.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f'Неизвестный формат выгрузки: {file_format}')
+    headers = list(table.columns)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if file_format == 'csv':
+        writer.writerow(headers)
+        yield buffer.getvalue()
+    rows = table.model.objects.order_by('pk').values_list(
+        *table.columns.values()
+    ).iterator(chunk_size=chunk_size)
+    for chunk in chunked(rows, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        for values in chunk:
+            if file_format == 'csv':
+                writer.writerow([to_csv_value(value) for value in values])
+            else:
+                buffer.write(json.dumps(
+                    dict(zip(headers, map(to_json_value, values))),
+                    ensure_ascii=False
+                ))
+                buffer.write('\n')
+        yield buffer.getvalue()
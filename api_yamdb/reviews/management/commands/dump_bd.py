@@ -0,0 +1,64 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from reviews import csv_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает данные в файлы того же вида, что и .../static/data/ '
+        '(обратная к fill_bd)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            required=True,
+            help='Каталог, в который записываются файлы',
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(csv_data.EXPORT_FORMATS),
+            default='csv',
+            help='Формат файлов: csv (как static/data/) или ndjson',
+        )
+        parser.add_argument(
+            '--tables',
+            nargs='+',
+            default=[table.name for table in csv_data.TABLES],
+            help='Выгружаемые таблицы (имена файлов без расширения)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество строк, читаемых из БД за один раз',
+        )
+
+    def handle(self, *args, **options):
+        tables = []
+        for name in options['tables']:
+            table = csv_data.get_table(name)
+            if table is None:
+                raise CommandError(f'Неизвестная таблица: {name}')
+            tables.append(table)
+        os.makedirs(options['path'], exist_ok=True)
+        file_format = options['format']
+        for table in tables:
+            filename = f'{table.name}.{file_format}'
+            started = time.monotonic()
+            with open(
+                os.path.join(options['path'], filename), 'w',
+                encoding='utf-8', newline=''
+            ) as file:
+                for chunk in csv_data.export_table(
+                    table, file_format, options['chunk_size']
+                ):
+                    file.write(chunk)
+                size = file.tell()
+            self.stdout.write(
+                f'{filename}: {size / 1024:.1f} КБ за '
+                f'{time.monotonic() - started:.2f} с'
+            )
+        self.stdout.write('Выгрузка прошла успешно...')
@@ -2,8 +2,13 @@ import csv
 import os
 
 from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from reviews import csv_data
 from reviews.management.commands import func_csv
+from reviews.models import Review, Title
 
 BASE_DIR = settings.BASE_DIR
 
@@ -18,15 +23,73 @@ csv_to_func = {
 }
 
 
+def update_in_batches(model, method, batch_size):
+    """
+    Вызывает метод QuerySet `method` для записей модели пачками по
+    диапазонам id, каждую пачку в своей транзакции, как update_rating.
+    """
+    last_id = model.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+    updated = 0
+    for start in range(0, last_id, batch_size):
+        with transaction.atomic():
+            updated += getattr(model.objects.filter(
+                pk__gt=start,
+                pk__lte=start + batch_size
+            ), method)()
+    return updated
+
+
+def update_derived_data(stdout, batch_size=1000):
+    """Пересчитывает рейтинги и поисковые векторы после загрузки."""
+    update_in_batches(Title, 'recalculate_rating', batch_size)
+    update_in_batches(Title, 'update_search_vector', batch_size)
+    update_in_batches(Review, 'update_search_vector', batch_size)
+    call_command('update_top', batch_size=batch_size, stdout=stdout)
+
+
 class Command(BaseCommand):
     help = 'Загружает данные из CSV-файла (.../static/data/)'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(BASE_DIR, 'static/data/'),
+            help='Каталог с CSV-файлами',
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Загружать файлы пачками через bulk_create',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одной пачке для режима --bulk',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Количество потоков для одновременной загрузки независимых '
+                'таблиц в режиме --bulk (только PostgreSQL)'
+            ),
+        )
+
     def handle(self, *args, **options):
-        for filename, row in csv_to_func.items():
-            path = os.path.join(BASE_DIR, 'static/data/') + filename
-            with open(path, 'r', encoding='utf-8') as file:
-                reader = csv.reader(file)
-                next(reader)
-                for row in reader:
-                    csv_to_func[filename](row)
+        if options['bulk']:
+            csv_data.load_tables(
+                options['path'], options['batch_size'], self.stdout,
+                workers=options['workers']
+            )
+        else:
+            for filename, row in csv_to_func.items():
+                path = os.path.join(options['path'], filename)
+                with open(path, 'r', encoding='utf-8') as file:
+                    reader = csv.reader(file)
+                    next(reader)
+                    for row in reader:
+                        csv_to_func[filename](row)
+        update_derived_data(self.stdout, options['batch_size'])
         self.stdout.write('Запись прошла успешно...')
@@ -0,0 +1,104 @@
+import csv
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from reviews import csv_data
+from reviews.management.commands.fill_bd import update_derived_data
+from reviews.synthetic import SyntheticData
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетические данные заданного объёма: сразу в БД или '
+        'в CSV-файлах для fill_bd'
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('--users', 1000, 'Количество пользователей'),
+            ('--titles', 200, 'Количество произведений'),
+            ('--reviews', 2000, 'Количество отзывов'),
+            ('--comments', 5000, 'Количество комментариев'),
+            ('--categories', 10, 'Количество категорий'),
+            ('--genres', 30, 'Количество жанров'),
+            ('--seed', 0, 'Начальное значение генератора случайных чисел'),
+        ):
+            parser.add_argument(
+                name, type=int, default=default, help=help_text
+            )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.0,
+            help=(
+                'Показатель распределения Ципфа для числа отзывов '
+                'на произведение (0 - равномерно)'
+            ),
+        )
+        parser.add_argument(
+            '--path',
+            help=(
+                'Каталог для CSV-файлов в формате fill_bd; '
+                'без него данные записываются сразу в БД'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной пачке',
+        )
+
+    def write_csv(self, table, rows, path, batch_size):
+        headers = list(table.columns)
+        count = 0
+        with open(
+            os.path.join(path, table.filename), 'w', encoding='utf-8',
+            newline=''
+        ) as file:
+            writer = csv.writer(file, lineterminator='\n')
+            writer.writerow(headers)
+            for chunk in csv_data.chunked(rows, batch_size):
+                writer.writerows(
+                    [row[header] for header in headers] for row in chunk
+                )
+                count += len(chunk)
+        return count
+
+    def handle(self, *args, **options):
+        data = SyntheticData(
+            users=options['users'], titles=options['titles'],
+            reviews=options['reviews'], comments=options['comments'],
+            categories=options['categories'], genres=options['genres'],
+            seed=options['seed'], exponent=options['zipf'],
+        )
+        path = options['path']
+        if path:
+            os.makedirs(path, exist_ok=True)
+        levels = csv_data.dependency_levels(list(csv_data.TABLES))
+        for table in (table for level in levels for table in level):
+            started = time.monotonic()
+            if path:
+                count = self.write_csv(
+                    table, data.rows(table), path, options['batch_size']
+                )
+            else:
+                count, _ = csv_data.bulk_load(
+                    table, data.rows(table), options['batch_size'],
+                    check_parents=False
+                )
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'{table.filename}: {count} строк за {elapsed:.2f} с '
+                f'({count / max(elapsed, 1e-6):.0f} строк/с)'
+            )
+        if path:
+            self.stdout.write(
+                f'Файлы записаны в {path}, загрузка: '
+                f'python manage.py fill_bd --bulk --path {path}'
+            )
+            return
+        csv_data.reset_sequences([table.model for table in csv_data.TABLES])
+        update_derived_data(self.stdout, options['batch_size'])
+        self.stdout.write('Данные созданы...')
@@ -0,0 +1,65 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает взвешенный рейтинг произведений, по которому '
+        'строятся рейтинги лучших (/api/v1/titles/top/)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество произведений, пересчитываемых за одну транзакцию',
+        )
+        parser.add_argument(
+            '--prior-count',
+            type=int,
+            default=settings.TOP_RATING_PRIOR_COUNT,
+            help='Вес средней оценки по всем произведениям',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а пересчитывать рейтинг периодически',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=600,
+            help='Пауза между пересчётами в режиме --loop, с',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            updated = self.update(
+                options['batch_size'], options['prior_count']
+            )
+            self.stdout.write(
+                f'Взвешенный рейтинг пересчитан для {updated} произведений'
+            )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def update(self, batch_size, prior_count):
+        mean = Title.objects.rating_mean()
+        if mean is None:
+            return 0
+        last_id = Title.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+        updated = 0
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                updated += Title.objects.filter(
+                    pk__gt=start,
+                    pk__lte=start + batch_size
+                ).update_weighted_rating(prior_count, mean)
+        return updated
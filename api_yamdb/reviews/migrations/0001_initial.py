@@ -0,0 +1,112 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:01
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Название категории, к которой относится произведение', max_length=256, verbose_name='Категория')),
+                ('slug', models.SlugField(help_text='Уникальный фрагмент URL-адреса', unique=True, verbose_name='Слаг')),
+            ],
+            options={
+                'verbose_name': 'Категория',
+                'verbose_name_plural': 'Категории',
+                'ordering': ('name',),
+            },
+        ),
+        migrations.CreateModel(
+            name='Genre',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Название жанра, к которому относится произведение', max_length=256, verbose_name='Жанр')),
+                ('slug', models.SlugField(help_text='Уникальный фрагмент URL-адреса', unique=True, verbose_name='Слаг')),
+            ],
+            options={
+                'verbose_name': ('Жанр',),
+                'verbose_name_plural': 'Жанры',
+                'ordering': ('name',),
+            },
+        ),
+        migrations.CreateModel(
+            name='GenreTitle',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='genres', to='reviews.Genre', verbose_name='Жанр')),
+            ],
+            options={
+                'verbose_name': 'Произведение и жанр',
+                'verbose_name_plural': 'Произведения и жанры',
+                'ordering': ('title', 'genre'),
+            },
+        ),
+        migrations.CreateModel(
+            name='Title',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Название произведения', max_length=256, verbose_name='Произведение')),
+                ('year', models.PositiveIntegerField(db_index=True, help_text='Используйте формат для года <YYYY>', validators=[django.core.validators.MinValueValidator(1600), django.core.validators.MaxValueValidator(2026)], verbose_name='Год')),
+                ('description', models.TextField(blank=True, help_text='Краткое содержание произведения', max_length=2000, null=True, verbose_name='Описание')),
+                ('category', models.ForeignKey(help_text='Название категории, к которому относится произведение', null=True, on_delete=django.db.models.deletion.SET_NULL, to='reviews.Category', verbose_name='Категория')),
+                ('genre', models.ManyToManyField(help_text='Название жанра, к которому относится произведение', related_name='titles', through='reviews.GenreTitle', to='reviews.Genre', verbose_name='Жанр')),
+            ],
+            options={
+                'verbose_name': 'Произведение',
+                'verbose_name_plural': 'Произведения',
+                'ordering': ('name',),
+            },
+        ),
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(auto_now_add=True, verbose_name='дата создания')),
+                ('text', models.TextField(help_text='Введите текст отзыва', verbose_name='текст отзыва')),
+                ('score', models.PositiveSmallIntegerField(choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5'), (6, '6'), (7, '7'), (8, '8'), (9, '9'), (10, '10')], help_text='Дайте оценку произведению от 1 до 10', verbose_name='оценка')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to=settings.AUTH_USER_MODEL, verbose_name='автор')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='reviews.Title', verbose_name='произведение')),
+            ],
+            options={
+                'verbose_name': 'отзыв',
+                'verbose_name_plural': 'отзывы',
+                'ordering': ('-pub_date',),
+            },
+        ),
+        migrations.AddField(
+            model_name='genretitle',
+            name='title',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='titles', to='reviews.Title', verbose_name='Произведение'),
+        ),
+        migrations.CreateModel(
+            name='Comment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(auto_now_add=True, verbose_name='дата создания')),
+                ('text', models.TextField(help_text='Введите текст комментария', verbose_name='текст комментария')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to=settings.AUTH_USER_MODEL, verbose_name='автор')),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.Review', verbose_name='произведение')),
+            ],
+            options={
+                'verbose_name': 'комментарий',
+                'verbose_name_plural': 'комментарии',
+                'ordering': ('-pub_date',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('author', 'title'), name='unique_review_per_author_title'),
+        ),
+    ]
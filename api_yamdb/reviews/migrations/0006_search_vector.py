@@ -0,0 +1,65 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:18
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_INDEXES = (
+    ('reviews_title', 'title_search_vector_idx'),
+    ('reviews_review', 'review_search_vector_idx'),
+)
+
+
+def fill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    config = settings.SEARCH_CONFIG
+    apps.get_model('reviews', 'Title').objects.update(
+        search_vector=(
+            SearchVector('name', weight='A', config=config)
+            + SearchVector('description', weight='B', config=config)
+        )
+    )
+    apps.get_model('reviews', 'Review').objects.update(
+        search_vector=SearchVector('text', weight='C', config=config)
+    )
+
+
+def create_search_indexes(apps, schema_editor):
+    """GIN-индексы есть только в PostgreSQL, на SQLite поиск идёт в памяти."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, name in SEARCH_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX {name} ON {table} USING gin (search_vector)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _, name in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='поисковый вектор'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(fill_search_vector, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:22
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, FloatField, Sum
+from django.db.models.functions import Cast
+
+
+def fill_weighted_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    totals = Title.objects.aggregate(
+        rating_sum=Sum('rating_sum'), rating_count=Sum('rating_count')
+    )
+    if not totals['rating_count']:
+        return
+    mean = totals['rating_sum'] / totals['rating_count']
+    prior_count = settings.TOP_RATING_PRIOR_COUNT
+    Title.objects.filter(rating_count__gt=0).update(weighted_rating=Cast(
+        (Cast('rating_sum', FloatField()) + prior_count * mean)
+        / (F('rating_count') + prior_count),
+        FloatField()
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(blank=True, help_text='Байесовская оценка для рейтингов лучших произведений', null=True, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-weighted_rating', 'id'], name='title_weighted_rating_idx'),
+        ),
+        migrations.RunPython(fill_weighted_rating, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,15 @@
+import operator
 from datetime import datetime
+from functools import reduce
 
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models
+from django.db.models import (Avg, Case, Count, ExpressionWrapper, F,
+                              FloatField, OuterRef, Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
 from users.models import User
 
 SCORE_CHOICES = [(i, str(i)) for i in range(1, 11)]
@@ -49,6 +57,101 @@ class Genre(models.Model):
         return self.name
 
 
+class SearchQuerySet(models.QuerySet):
+    """
+    Полнотекстовый поиск по полю search_vector (только PostgreSQL).
+
+    Поля и их веса в векторе задаёт атрибут модели SEARCH_WEIGHTS.
+    """
+
+    def update_search_vector(self):
+        """Пересчитывает поисковый вектор, вне PostgreSQL ничего не делает."""
+        if connections[self.db].vendor != 'postgresql':
+            return 0
+        return self.update(search_vector=reduce(operator.add, (
+            SearchVector(field, weight=weight, config=settings.SEARCH_CONFIG)
+            for field, weight in self.model.SEARCH_WEIGHTS
+        )))
+
+
+class TitleQuerySet(SearchQuerySet):
+
+    def for_listing(self):
+        """
+        Подгружает категорию и жанры, которые выводят сериализаторы
+        произведений, чтобы не делать по запросу на каждый объект.
+        """
+        return self.select_related('category').prefetch_related('genre')
+
+    def change_rating(self, score_delta, count_delta):
+        """
+        Атомарно изменяет сумму и количество оценок произведений
+        и пересчитывает рейтинг одним UPDATE без выборки отзывов.
+        """
+        rating_sum = F('rating_sum') + score_delta
+        rating_count = F('rating_count') + count_delta
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            modified=timezone.now(),
+            rating=Case(
+                When(
+                    rating_count__gt=-count_delta,
+                    then=ExpressionWrapper(
+                        Cast(rating_sum, FloatField()) / rating_count,
+                        output_field=FloatField()
+                    )
+                ),
+                default=Value(None),
+                output_field=FloatField()
+            )
+        )
+
+    def recalculate_rating(self):
+        """Пересчитывает рейтинг произведений по всем их отзывам."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        rating_sum = reviews.annotate(total=Sum('score')).values('total')
+        rating_count = reviews.annotate(total=Count('pk')).values('total')
+        rating = reviews.annotate(total=Avg('score')).values('total')
+        return self.update(
+            rating_sum=Coalesce(Subquery(rating_sum), 0),
+            rating_count=Coalesce(Subquery(rating_count), 0),
+            rating=Subquery(rating, output_field=FloatField()),
+            modified=timezone.now(),
+        )
+
+    def rating_mean(self):
+        """Средняя оценка по всем отзывам на произведения выборки."""
+        totals = self.aggregate(
+            rating_sum=Sum('rating_sum'), rating_count=Sum('rating_count')
+        )
+        if not totals['rating_count']:
+            return None
+        return totals['rating_sum'] / totals['rating_count']
+
+    def update_weighted_rating(self, prior_count, mean):
+        """
+        Байесовский рейтинг для рейтингов лучших произведений:
+        (сумма оценок + m * C) / (количество оценок + m), где C - средняя
+        оценка по всем произведениям, m - вес этой априорной оценки.
+        У произведений с малым числом отзывов рейтинг тянется к C.
+        """
+        return self.update(weighted_rating=Case(
+            When(
+                rating_count__gt=0,
+                then=ExpressionWrapper(
+                    (Cast('rating_sum', FloatField()) + prior_count * mean)
+                    / (F('rating_count') + prior_count),
+                    output_field=FloatField()
+                )
+            ),
+            default=Value(None),
+            output_field=FloatField()
+        ))
+
+
 class Title(models.Model):
     name = models.CharField(
         max_length=256,
@@ -85,11 +188,56 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок',
+        help_text='Сумма оценок всех отзывов на произведение',
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество оценок',
+        help_text='Количество отзывов на произведение',
+    )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Рейтинг',
+        help_text='Средняя оценка произведения',
+    )
+    weighted_rating = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Взвешенный рейтинг',
+        help_text='Байесовская оценка для рейтингов лучших произведений',
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый вектор',
+    )
+
+    SEARCH_WEIGHTS = (('name', 'A'), ('description', 'B'))
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ('name', )
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+            models.Index(
+                fields=('category', 'name'), name='title_category_name_idx'
+            ),
+            models.Index(
+                fields=('-weighted_rating', 'id'),
+                name='title_weighted_rating_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -100,6 +248,10 @@ class CreatedModel(models.Model):
         'дата создания',
         auto_now_add=True
     )
+    modified = models.DateTimeField(
+        'дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         abstract = True
@@ -127,6 +279,16 @@ class GenreTitle(models.Model):
         ordering = ('title', 'genre')
         verbose_name = 'Произведение и жанр'
         verbose_name_plural = 'Произведения и жанры'
+        indexes = (
+            models.Index(
+                fields=('genre', 'title'), name='genretitle_genre_title_idx'
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'genre'), name='unique_genre_per_title'
+            ),
+        )
 
 
 class Review(CreatedModel):
@@ -151,11 +313,26 @@ class Review(CreatedModel):
         related_name='reviews',
         verbose_name='произведение'
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='поисковый вектор',
+    )
+
+    SEARCH_WEIGHTS = (('text', 'C'), )
+
+    objects = SearchQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date', )
         verbose_name = 'отзыв'
         verbose_name_plural = 'отзывы'
+        indexes = (
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx'
+            ),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=('author', 'title'),
@@ -189,6 +366,12 @@ class Comment(CreatedModel):
         ordering = ('-pub_date', )
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
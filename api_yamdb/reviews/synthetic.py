@@ -0,0 +1,191 @@
+"""
+Синтетические данные в формате CSV-файлов static/data/ (см. csv_data).
+
+Данные детерминированы: одинаковые параметры и `seed` дают одинаковые
+строки. Популярность произведений распределена по закону Ципфа:
+произведение ранга r получает долю отзывов, пропорциональную 1 / r ** s;
+комментарии распределяются по произведениям пропорционально числу
+отзывов. Строки создаются генераторами по одной, в памяти хранятся
+только счётчики на произведение, поэтому объём не ограничен памятью.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+from reviews.csv_data import format_datetime
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'музыка',
+    'актёр', 'сцена', 'история', 'смысл', 'атмосфера', 'образ', 'жанр',
+    'очень', 'совсем', 'неожиданно', 'скучно', 'интересно', 'красиво',
+    'хороший', 'слабый', 'сильный', 'странный', 'лучший', 'средний',
+    'понравился', 'разочаровал', 'рекомендую', 'пересмотрю',
+)
+SCORES = range(1, 11)
+# Оценки смещены к верхней половине шкалы, как в настоящих отзывах.
+SCORE_WEIGHTS = (2, 1, 2, 3, 5, 8, 12, 15, 12, 10)
+ROLES = ('user', 'moderator', 'admin')
+ROLE_WEIGHTS = (989, 10, 1)
+DATES_START = datetime(2015, 1, 1, tzinfo=timezone.utc)
+# Восемь лет в миллисекундах.
+DATES_SPAN = 8 * 365 * 24 * 60 * 60 * 1000
+
+
+def allocate(total, weights, cap=None):
+    """
+    Распределяет `total` единиц пропорционально весам так, что
+    ни одна доля не превышает `cap`; излишек переходит к остальным.
+    """
+    counts = [0] * len(weights)
+    active = [index for index, weight in enumerate(weights) if weight > 0]
+    if cap is not None:
+        total = min(total, cap * len(active))
+    remaining = total
+    while remaining > 0 and active:
+        weight_sum = sum(weights[index] for index in active)
+        added = 0
+        for index in active:
+            share = int(remaining * weights[index] / weight_sum)
+            if cap is not None:
+                share = min(share, cap - counts[index])
+            counts[index] += share
+            added += share
+        if added == 0:
+            # Остаток меньше числа долей: по одной по убыванию веса.
+            for index in sorted(active, key=lambda index: -weights[index]):
+                if added == remaining:
+                    break
+                counts[index] += 1
+                added += 1
+        remaining -= added
+        if cap is not None:
+            active = [index for index in active if counts[index] < cap]
+    return counts
+
+
+class SyntheticData:
+    """Строки таблиц (заголовок файла -> значение) для заданных объёмов."""
+
+    def __init__(self, users, titles, reviews, comments, categories=10,
+                 genres=30, seed=0, exponent=1.0):
+        self.users = users
+        self.titles = titles
+        self.reviews = reviews
+        self.comments = comments
+        self.categories = categories
+        self.genres = genres
+        self.seed = seed
+        self.exponent = exponent
+        self._review_counts = None
+        self._comment_counts = None
+
+    def random(self, name):
+        """Отдельный генератор на таблицу: таблицы не зависят друг от друга."""
+        return random.Random(f'{self.seed}:{name}')
+
+    def text(self, rng, words):
+        return ' '.join(rng.choices(WORDS, k=words)).capitalize() + '.'
+
+    def date(self, rng):
+        return format_datetime(DATES_START + timedelta(
+            milliseconds=int(rng.random() * DATES_SPAN)
+        ))
+
+    @property
+    def review_counts(self):
+        """Число отзывов на каждое произведение (по порядку id)."""
+        if self._review_counts is None:
+            ranks = list(range(1, self.titles + 1))
+            self.random('popularity').shuffle(ranks)
+            self._review_counts = allocate(
+                self.reviews,
+                [1 / rank ** self.exponent for rank in ranks],
+                cap=self.users
+            )
+        return self._review_counts
+
+    @property
+    def comment_counts(self):
+        """Число комментариев к отзывам каждого произведения."""
+        if self._comment_counts is None:
+            self._comment_counts = allocate(
+                self.comments if self.users else 0, self.review_counts
+            )
+        return self._comment_counts
+
+    def category_rows(self):
+        for pk in range(1, self.categories + 1):
+            yield {'id': pk, 'name': f'Категория {pk}', 'slug': f'cat-{pk}'}
+
+    def genre_rows(self):
+        for pk in range(1, self.genres + 1):
+            yield {'id': pk, 'name': f'Жанр {pk}', 'slug': f'genre-{pk}'}
+
+    def users_rows(self):
+        rng = self.random('users')
+        for pk in range(1, self.users + 1):
+            yield {
+                'id': pk, 'username': f'user{pk}',
+                'email': f'user{pk}@yamdb.fake',
+                'role': rng.choices(ROLES, ROLE_WEIGHTS)[0],
+                'bio': '', 'first_name': '', 'last_name': '',
+            }
+
+    def titles_rows(self):
+        rng = self.random('titles')
+        for pk in range(1, self.titles + 1):
+            yield {
+                'id': pk, 'name': f'Произведение {pk}',
+                'year': rng.randint(1900, 2023),
+                'category': (
+                    rng.randint(1, self.categories) if self.categories
+                    else ''
+                ),
+            }
+
+    def genre_title_rows(self):
+        rng = self.random('genre_title')
+        pk = 0
+        for title_id in range(1, self.titles + 1):
+            for genre_id in rng.sample(
+                range(1, self.genres + 1), min(self.genres, rng.randint(1, 3))
+            ):
+                pk += 1
+                yield {'id': pk, 'title_id': title_id, 'genre_id': genre_id}
+
+    def review_rows(self):
+        """Отзывы по произведениям: у одного автора один отзыв на каждое."""
+        rng = self.random('review')
+        pk = 0
+        for title_id, count in enumerate(self.review_counts, start=1):
+            for author in rng.sample(range(1, self.users + 1), count):
+                pk += 1
+                yield {
+                    'id': pk, 'title_id': title_id,
+                    'text': self.text(rng, rng.randint(5, 40)),
+                    'author': author,
+                    'score': rng.choices(SCORES, SCORE_WEIGHTS)[0],
+                    'pub_date': self.date(rng),
+                }
+
+    def comments_rows(self):
+        """Комментарии к случайным отзывам каждого произведения."""
+        rng = self.random('comments')
+        pk = 0
+        first_review = 1
+        for reviews, comments in zip(
+            self.review_counts, self.comment_counts
+        ):
+            for _ in range(comments):
+                pk += 1
+                yield {
+                    'id': pk,
+                    'review_id': first_review + rng.randrange(reviews),
+                    'text': self.text(rng, rng.randint(3, 20)),
+                    'author': rng.randint(1, self.users),
+                    'pub_date': self.date(rng),
+                }
+            first_review += reviews
+
+    def rows(self, table):
+        """Строки для таблицы csv_data.TABLES."""
+        return getattr(self, f'{table.name}_rows')()
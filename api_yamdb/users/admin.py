@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 @admin.register(User)
@@ -18,3 +18,18 @@ class AdminUser(admin.ModelAdmin):
     search_fields = ('username',)
     list_filter = ('username',)
     empty_value_display = '-пусто-'
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'recipient',
+        'subject',
+        'created',
+        'sent',
+        'attempts',
+    )
+    search_fields = ('recipient',)
+    list_filter = ('sent',)
+    empty_value_display = '-пусто-'
@@ -0,0 +1,139 @@
+import time
+from datetime import timedelta
+
+from api.metrics import EMAIL_SEND_DURATION, registry
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from users.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пачками через одно SMTP-соединение'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Количество писем, забираемых из очереди за раз',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Сколько раз пытаться отправить письмо до отказа',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новые письма',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2,
+            help='Пауза между проверками пустой очереди в режиме --loop, с',
+        )
+        parser.add_argument(
+            '--backoff',
+            type=float,
+            default=30,
+            help='Пауза перед второй попыткой отправки, с; '
+                 'каждая следующая пауза вдвое длиннее',
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        try:
+            while True:
+                sent = self.send_batch(
+                    connection, options['batch_size'],
+                    options['max_attempts'], options['backoff']
+                )
+                if sent:
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            connection.close()
+
+    def schedule_retry(self, email, error, backoff):
+        """Откладывает письмо: паузы растут вдвое с каждой попыткой."""
+        email.last_error = str(error)
+        email.next_attempt = timezone.now() + timedelta(
+            seconds=backoff * 2 ** (email.attempts - 1)
+        )
+
+    def send_batch(self, connection, batch_size, max_attempts, backoff):
+        """
+        Забирает пачку писем, которым подошло время отправки, отправляет
+        их и возвращает число доставленных.
+
+        Строки блокируются до конца транзакции с SKIP LOCKED, поэтому
+        несколько обработчиков могут разбирать очередь одновременно.
+        Соединение открывается на пачку и закрывается после неё.
+        """
+        with transaction.atomic():
+            emails = list(
+                OutgoingEmail.objects.select_for_update(skip_locked=True)
+                .filter(
+                    sent__isnull=True, attempts__lt=max_attempts,
+                    next_attempt__lte=timezone.now()
+                )
+                .order_by('next_attempt')[:batch_size]
+            )
+            if not emails:
+                return 0
+            sent = 0
+            try:
+                connection.open()
+            except Exception as error:
+                for email in emails:
+                    email.attempts += 1
+                    self.schedule_retry(email, error, backoff)
+                self.stderr.write(
+                    f'Нет соединения с почтовым сервером: {error}'
+                )
+            else:
+                try:
+                    sent = self.send_messages(connection, emails, backoff)
+                finally:
+                    connection.close()
+            OutgoingEmail.objects.bulk_update(
+                emails, ('attempts', 'sent', 'last_error', 'next_attempt')
+            )
+        registry.flush()
+        self.stdout.write(f'Отправлено писем: {sent} из {len(emails)}')
+        return sent
+
+    def send_messages(self, connection, emails, backoff):
+        sent = 0
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.message,
+                from_email=email.from_email,
+                to=[email.recipient],
+                connection=connection,
+            )
+            email.attempts += 1
+            started = time.perf_counter()
+            try:
+                message.send()
+            except Exception as error:
+                self.schedule_retry(email, error, backoff)
+                # Оборвавшееся соединение само не восстанавливается:
+                # open() считает его открытым, пока не вызван close().
+                connection.close()
+                result = 'failed'
+            else:
+                email.sent = timezone.now()
+                sent += 1
+                result = 'sent'
+            EMAIL_SEND_DURATION.observe(
+                time.perf_counter() - started, result=result
+            )
+        return sent
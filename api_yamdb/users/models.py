@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -39,6 +40,9 @@ class User(AbstractUser):
                 name="unique_fields"
             ),
         ]
+        indexes = [
+            models.Index(fields=['role'], name='user_role_idx'),
+        ]
 
     @property
     def is_user(self):
@@ -54,3 +58,31 @@ class User(AbstractUser):
 
     def __str__(self) -> str:
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (см. команду send_emails)."""
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipient = models.EmailField(max_length=254)
+    created = models.DateTimeField(auto_now_add=True)
+    sent = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ('created', )
+        verbose_name = 'письмо'
+        verbose_name_plural = 'очередь писем'
+        indexes = [
+            models.Index(
+                fields=['next_attempt'],
+                name='outgoing_email_pending_idx',
+                condition=models.Q(sent__isnull=True),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.recipient}: {self.subject}'
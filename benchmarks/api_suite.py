@@ -0,0 +1,309 @@
+"""
+Сквозной бенчмарк API: задержки p50/p95/p99, пропускная способность
+и число SQL-запросов на запрос для основных эндпоинтов.
+
+    python benchmarks/api_suite.py --titles 2000 --reviews 20000 \
+        --save benchmarks/baselines/api_suite.json
+    python benchmarks/api_suite.py --titles 2000 --reviews 20000 \
+        --compare benchmarks/baselines/api_suite.json --threshold 0.2
+
+Данные создаются командой generate_bd в отдельной тестовой базе, которая
+удаляется в конце, запросы выполняются в том же процессе через тестовый
+клиент DRF. Кэш ответов на время замера отключается (`--cache` оставляет
+настроенный). С `--compare` сравнивает результаты с сохранёнными
+и завершается с кодом 1, если p95 вырос больше чем на `--threshold`
+или запросов к БД стало больше. Если сохранённые результаты получены
+на другом процессоре или объёме данных, рост задержек только выводится
+предупреждением, а на другой СУБД - и рост числа запросов.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import ExitStack
+from io import StringIO
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                    'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+from reviews.models import Title  # noqa: E402
+from users.models import User  # noqa: E402
+
+CONFIRMATION_CODE = 'benchmark'
+# Поля meta, без совпадения которых задержки несравнимы.
+COMPARABLE_META = (
+    'cpu', 'cpus', 'database', 'users', 'titles', 'reviews', 'comments',
+)
+
+
+class QueryCounter:
+    """Считает SQL-запросы через connection.execute_wrapper."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, fraction):
+    """Перцентиль с линейной интерполяцией (как numpy по умолчанию)."""
+    values = sorted(values)
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (
+        position - lower
+    )
+
+
+def seed(args):
+    call_command(
+        'generate_bd', '--users', str(args.users), '--titles',
+        str(args.titles), '--reviews', str(args.reviews), '--comments',
+        str(args.comments), '--seed', str(args.seed), stdout=StringIO()
+    )
+    User.objects.update(confirmation_code=CONFIRMATION_CODE)
+    usernames = [
+        f'bench{number}' for number in range(args.requests + args.warmup)
+    ]
+    User.objects.bulk_create(
+        User(username=username, email=f'{username}@yamdb.fake')
+        for username in usernames
+    )
+    # bulk_create заполняет pk не на всех СУБД (на SQLite - нет).
+    authors = User.objects.in_bulk(usernames, field_name='username')
+    title = Title.objects.order_by('-rating_count', 'pk').first()
+    review = title.reviews.order_by('pk').first()
+    return title, review, [
+        f'Bearer {AccessToken.for_user(authors[username])}'
+        for username in usernames
+    ]
+
+
+def get_endpoints(title, review, tokens, users):
+    """
+    Эндпоинты: имя -> (метод, функция номера запроса -> (адрес, данные,
+    заголовок Authorization)).
+    """
+    titles_url = '/api/v1/titles/'
+    reviews_url = f'{titles_url}{title.pk}/reviews/'
+    comments_url = f'{reviews_url}{review.pk}/comments/'
+    return {
+        'titles_list': ('get', lambda i: (titles_url, None, None)),
+        'titles_filter': ('get', lambda i: (
+            titles_url, {'genre': 'genre-1', 'year': 2000}, None
+        )),
+        'titles_cursor': ('get', lambda i: (
+            titles_url, {'pagination': 'cursor', 'page_size': 100}, None
+        )),
+        'title_detail': ('get', lambda i: (
+            f'{titles_url}{title.pk}/', None, None
+        )),
+        'titles_top': ('get', lambda i: (f'{titles_url}top/', None, None)),
+        'reviews_list': ('get', lambda i: (reviews_url, None, None)),
+        'review_create': ('post', lambda i: (
+            reviews_url, {'text': 'Отзыв', 'score': i % 10 + 1}, tokens[i]
+        )),
+        'comments_list': ('get', lambda i: (comments_url, None, None)),
+        'comment_create': ('post', lambda i: (
+            comments_url, {'text': 'Комментарий'}, tokens[i]
+        )),
+        'signup': ('post', lambda i: (
+            '/api/v1/auth/signup/',
+            {'username': f'signup{i}', 'email': f'signup{i}@yamdb.fake'},
+            None
+        )),
+        'token': ('post', lambda i: (
+            '/api/v1/auth/token/',
+            {'username': f'user{i % users + 1}',
+             'confirmation_code': CONFIRMATION_CODE},
+            None
+        )),
+    }
+
+
+def measure(client, method, request, warmup, requests):
+    durations = []
+    queries = []
+    for number in range(warmup + requests):
+        url, data, authorization = request(number)
+        kwargs = {'HTTP_AUTHORIZATION': authorization} if authorization else {}
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            if method == 'post':
+                response = client.post(url, data, format='json', **kwargs)
+            else:
+                response = client.get(url, data, **kwargs)
+            elapsed = time.perf_counter() - started
+        assert response.status_code < 400, (url, response.status_code)
+        if number >= warmup:
+            durations.append(elapsed)
+            queries.append(counter.count)
+    return {
+        'p50_ms': percentile(durations, 0.5) * 1000,
+        'p95_ms': percentile(durations, 0.95) * 1000,
+        'p99_ms': percentile(durations, 0.99) * 1000,
+        'rps': len(durations) / sum(durations),
+        'queries': percentile(queries, 0.5),
+        'max_queries': max(queries),
+    }
+
+
+def get_cpu():
+    """Модель процессора (на Linux - из /proc/cpuinfo)."""
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as file:
+            for line in file:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def get_meta(args):
+    return {
+        'users': args.users, 'titles': args.titles,
+        'reviews': args.reviews, 'comments': args.comments,
+        'requests': args.requests,
+        'database': connection.vendor,
+        'cpu': get_cpu(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Регрессии относительно сохранённых результатов: списки роста задержек
+    и роста числа SQL-запросов.
+    """
+    latency, queries = [], []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            latency.append(
+                f'{name}: p95 {previous["p95_ms"]:.1f} -> '
+                f'{result["p95_ms"]:.1f} мс'
+            )
+        if result['queries'] > previous['queries']:
+            queries.append(
+                f'{name}: запросов к БД {previous["queries"]:g} -> '
+                f'{result["queries"]:g}'
+            )
+    return latency, queries
+
+
+def check_baseline(results, meta, path, threshold):
+    """Сравнивает с сохранёнными результатами; False при регрессии."""
+    with open(path, encoding='utf-8') as file:
+        baseline = json.load(file)
+    mismatched = [
+        key for key in COMPARABLE_META
+        if baseline['meta'].get(key) != meta[key]
+    ]
+    latency, queries = compare(results, baseline['results'], threshold)
+    if mismatched:
+        print('Сохранённые результаты получены в другом окружении '
+              f'({", ".join(mismatched)}): рост задержек не считается '
+              'регрессией')
+        if 'database' in mismatched:
+            # На другой СУБД иначе выполняются, например, SAVEPOINT.
+            latency += queries
+            queries = []
+        for regression in latency:
+            print(f'ПРЕДУПРЕЖДЕНИЕ {regression}')
+        latency = []
+    for regression in latency + queries:
+        print(f'РЕГРЕССИЯ {regression}')
+    if latency or queries:
+        return False
+    print('Регрессий нет')
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--titles', type=int, default=500)
+    parser.add_argument('--reviews', type=int, default=5000)
+    parser.add_argument('--comments', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument(
+        '--endpoints', nargs='+', help='Только эти эндпоинты'
+    )
+    parser.add_argument('--cache', action='store_true')
+    parser.add_argument('--save', help='Сохранить результаты в JSON')
+    parser.add_argument('--compare', help='Сравнить с результатами из JSON')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        with ExitStack() as stack:
+            stack.enter_context(override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+            ))
+            if not args.cache:
+                stack.enter_context(override_settings(CACHES={'default': {
+                    'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+                }}))
+            title, review, tokens = seed(args)
+            endpoints = get_endpoints(title, review, tokens, args.users)
+            results = {}
+            print(f'{"":>16} {"p50, мс":>9} {"p95, мс":>9} {"p99, мс":>9} '
+                  f'{"запр./с":>9} {"SQL":>5}')
+            for name, (method, request) in endpoints.items():
+                if args.endpoints and name not in args.endpoints:
+                    continue
+                result = measure(
+                    APIClient(), method, request, args.warmup, args.requests
+                )
+                results[name] = result
+                print(
+                    f'{name:>16} {result["p50_ms"]:9.2f} '
+                    f'{result["p95_ms"]:9.2f} {result["p99_ms"]:9.2f} '
+                    f'{result["rps"]:9.0f} {result["queries"]:5g}'
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    meta = get_meta(args)
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)),
+                    exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump({'meta': meta, 'results': results}, file,
+                      ensure_ascii=False, indent=2)
+    if args.compare and not check_baseline(
+        results, meta, args.compare, args.threshold
+    ):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Бенчмарк списков API: запросов в секунду с обычным JSONRenderer
+и ModelSerializer и с быстрым путём (FastJSONRenderer и values()).
+
+    python benchmarks/api_throughput.py --titles 200 --requests 300
+
+Кэш ответов на время замера отключается, данные создаются в отдельной
+тестовой базе, которая удаляется в конце.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                    'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from api import views  # noqa: E402
+from api.renderers import FastJSONRenderer  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from reviews.models import (Category, Comment, Genre, GenreTitle,  # noqa: E402
+                            Review, Title)
+from users.models import User  # noqa: E402
+
+VIEWSETS = (views.TitleViewSet, views.ReviewViewSet, views.CommentViewSet)
+MODES = (
+    ('ModelSerializer + JSONRenderer', False, JSONRenderer),
+    ('values() + FastJSONRenderer', True, FastJSONRenderer),
+)
+
+
+def create_data(count):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = Genre.objects.bulk_create(
+        Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(5)
+    )
+    titles = Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {number}', year=2000, category=category,
+            description='Описание произведения. ' * 20,
+        )
+        for number in range(count)
+    )
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title in titles for genre in genres[:3]
+    )
+    authors = User.objects.bulk_create(
+        User(username=f'user{number}', email=f'user{number}@yamdb.fake')
+        for number in range(20)
+    )
+    reviews = Review.objects.bulk_create(
+        Review(title=titles[0], author=author, text='Текст отзыва. ' * 30,
+               score=number % 10 + 1)
+        for number, author in enumerate(authors)
+    )
+    Comment.objects.bulk_create(
+        Comment(review=reviews[0], author=author, text='Комментарий. ' * 10)
+        for author in authors
+    )
+    return titles[0], reviews[0]
+
+
+def measure(client, url, requests):
+    client.get(url)
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+    return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--titles', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        title, review = create_data(args.titles)
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        )
+        client = APIClient()
+        dummy_cache = {'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }}
+        with override_settings(CACHES=dummy_cache):
+            for url in urls:
+                print(url)
+                for name, fast, renderer in MODES:
+                    for viewset in VIEWSETS:
+                        viewset.renderer_classes = (renderer, )
+                    with override_settings(API_FAST_SERIALIZATION=fast):
+                        rate = measure(client, url, args.requests)
+                    print(f'  {name:>32}: {rate:7.0f} запросов/с')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Микробенчмарк подсказок названий: время ответа PrefixIndex на 100 тысячах
+названий и время инкрементального обновления индекса. БД не нужна.
+
+    python benchmarks/title_suggest.py --titles 100000 --requests 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                    'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.suggest import PrefixIndex  # noqa: E402
+
+WORDS = (
+    'война', 'мир', 'преступление', 'наказание', 'мастер', 'маргарита',
+    'дюна', 'солярис', 'пикник', 'обочина', 'город', 'звезда', 'море',
+    'star', 'wars', 'the', 'lord', 'rings', 'matrix', 'godfather',
+)
+
+
+def percentile(values, share):
+    return sorted(values)[int(len(values) * share)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--titles', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=10000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    names = [
+        ' '.join(random.choices(WORDS, k=random.randint(1, 4)))
+        + f' {number}'
+        for number in range(args.titles)
+    ]
+    started = time.perf_counter()
+    index = PrefixIndex(enumerate(names, start=1))
+    print(f'построение: {time.perf_counter() - started:.2f} с')
+
+    timings = []
+    for _ in range(args.requests):
+        name = random.choice(names)
+        prefix = name[:random.randint(1, len(name))]
+        started = time.perf_counter()
+        index.suggest(prefix, 10)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(
+        f'подсказка: медиана {statistics.median(timings):.4f} мс, '
+        f'p99 {percentile(timings, 0.99):.4f} мс'
+    )
+
+    timings = []
+    for number in range(1000):
+        started = time.perf_counter()
+        index.add(random.randint(1, args.titles), f'новое название {number}')
+        timings.append((time.perf_counter() - started) * 1000)
+    print(
+        f'обновление: медиана {statistics.median(timings):.4f} мс, '
+        f'p99 {percentile(timings, 0.99):.4f} мс'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Микробенчмарк выдачи JWT-токена: сколько токенов в секунду выдаёт
+прежняя реализация (три запроса к users_user и RefreshToken) и текущая
+(один запрос и только AccessToken).
+
+Запуск из корня репозитория, переменные окружения БД - как для проекта:
+
+    python benchmarks/token_issuance.py --users 1000 --requests 2000
+
+Данные создаются в отдельной тестовой базе, которая удаляется в конце.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                    'api_yamdb')
+)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from api.serializers import TokenSerializer  # noqa: E402
+from django.db import connection, reset_queries  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.generics import get_object_or_404  # noqa: E402
+from rest_framework_simplejwt import tokens  # noqa: E402
+from users.models import User  # noqa: E402
+
+
+def legacy_token(data):
+    """Выдача токена в том виде, в каком она была до оптимизации."""
+    user = get_object_or_404(User, username=data['username'])
+    if not User.objects.filter(
+        username=user.username,
+        confirmation_code=data['confirmation_code']
+    ).exists():
+        raise ValueError('Нет такого пользователя')
+    user = get_object_or_404(User, **data)
+    return str(tokens.RefreshToken.for_user(user).access_token)
+
+
+def current_token(data):
+    serializer = TokenSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    return str(tokens.AccessToken.for_user(serializer.validated_data['user']))
+
+
+def measure(name, issue, requests):
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for data in requests:
+            issue(data)
+        elapsed = time.perf_counter() - started
+    print(
+        f'{name:>8}: {len(requests) / elapsed:8.0f} токенов/с, '
+        f'{len(queries) / len(requests):.1f} запроса на токен'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        User.objects.bulk_create(
+            User(
+                username=f'user{number}',
+                email=f'user{number}@yamdb.fake',
+                confirmation_code=f'code{number}',
+            )
+            for number in range(args.users)
+        )
+        random.seed(0)
+        requests = [
+            {'username': f'user{number}', 'confirmation_code': f'code{number}'}
+            for number in (
+                random.randrange(args.users) for _ in range(args.requests)
+            )
+        ]
+        measure('до', legacy_token, requests)
+        measure('после', current_token, requests)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import pytest
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='testadmin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake'
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.fixture
+def user_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def create_titles():
+    from reviews.models import Category, Genre, Title
+
+    def create(count):
+        category, _ = Category.objects.get_or_create(
+            name='Фильм', slug='movie'
+        )
+        genres = [
+            Genre.objects.get_or_create(name='Драма', slug='drama')[0],
+            Genre.objects.get_or_create(name='Комедия', slug='comedy')[0],
+        ]
+        titles = []
+        for _ in range(count):
+            number = Title.objects.count()
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            title.genre.set(genres)
+            titles.append(title)
+        return titles
+
+    return create
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def query_budget(settings):
+    settings.QUERY_BUDGET_RAISE = True
@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def get_client(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        return client
+
+    def test_user_loaded_once(self, user):
+        client = self.get_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что пользователь из токена берётся из кэша, '
+            'а из БД читается только профиль'
+        )
+
+    def test_secrets_not_cached(self, user):
+        from api.authentication import get_user_cache_key
+        from django.core.cache import cache
+
+        user.confirmation_code = 'secret-code'
+        user.save()
+        client = self.get_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        cached = cache.get(get_user_cache_key(user.pk))
+        assert cached is not None
+        assert 'secret-code' not in cached
+        assert user.password not in cached
+
+    def test_me_keeps_current_role(self, user):
+        from users.models import User
+
+        client = self.get_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        # Роль меняется в обход сигналов: в кэше остаётся прежняя.
+        User.objects.filter(pk=user.pk).update(role='moderator')
+        response = client.patch('/api/v1/users/me/', {'bio': 'О себе'})
+        assert response.status_code == 200
+        assert response.json()['role'] == 'moderator'
+        user.refresh_from_db()
+        assert (user.role, user.bio) == ('moderator', 'О себе')
+
+    def test_role_change_invalidates_cache(self, user):
+        client = self.get_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        user.role = 'admin'
+        user.save()
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что изменение роли сбрасывает кэш пользователя'
+        )
+
+    def test_inactive_user_rejected(self, user):
+        client = self.get_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+
+@pytest.mark.django_db
+class TestTokenIssuance:
+    url = '/api/v1/auth/token/'
+
+    def test_token_single_query(self, client, user,
+                                django_assert_num_queries):
+        user.confirmation_code = 'secret-code'
+        user.save()
+        with django_assert_num_queries(1):
+            response = client.post(self.url, {
+                'username': user.username,
+                'confirmation_code': 'secret-code',
+            })
+        assert response.status_code == 201
+        response = APIClient(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["access"]}'
+        ).get('/api/v1/users/me/')
+        assert response.status_code == 200
+
+    def test_token_wrong_code(self, client, user):
+        user.confirmation_code = 'secret-code'
+        user.save()
+        response = client.post(self.url, {
+            'username': user.username, 'confirmation_code': 'wrong-code',
+        })
+        assert response.status_code == 400
+
+    def test_token_unknown_user(self, client):
+        response = client.post(self.url, {
+            'username': 'nobody', 'confirmation_code': 'code',
+        })
+        assert response.status_code == 404
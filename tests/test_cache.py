@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCatalogCache:
+
+    def test_titles_cached_until_catalog_changes(self, client, admin_client,
+                                                 create_titles):
+        title, = create_titles(1)
+        url = f'/api/v1/titles/{title.pk}/'
+        assert client.get(url)['X-Cache'] == 'MISS'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response['X-Cache'] == 'HIT'
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что закэшированный ответ отдаётся без запросов к БД'
+        )
+        response = admin_client.post(
+            f'/api/v1/titles/{title.pk}/reviews/', {'text': 'Да', 'score': 7}
+        )
+        assert response.status_code == 201
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений'
+        )
+        assert response.json()['rating'] == 7
+
+    def test_version_key_evicted(self, client, admin_client):
+        from api.cache import CATALOG_VERSION_KEY
+        from django.core.cache import cache
+
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        admin_client.post('/api/v1/genres/', {'name': 'Рок', 'slug': 'rock'})
+        cache.delete(CATALOG_VERSION_KEY)
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что после вытеснения ключа версии из кэша '
+            'не отдаются ответы, закэшированные под прежними версиями'
+        )
+        assert response.json()['count'] == 1
+
+    def test_cache_key_includes_query_and_role(self, client, admin_client,
+                                               create_titles):
+        create_titles(1)
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        assert client.get('/api/v1/genres/?search=д')['X-Cache'] == 'MISS'
+        assert admin_client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'HIT'
+        admin_client.post('/api/v1/genres/', {'name': 'Рок', 'slug': 'rock'})
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 3
@@ -0,0 +1,69 @@
+import gzip
+
+import pytest
+
+
+@pytest.fixture
+def titles(create_titles):
+    return create_titles(30)
+
+
+def test_parse_accept_encoding():
+    from api.middleware import GzipCompressor, get_compressor
+
+    assert get_compressor('') is None
+    assert get_compressor('gzip;q=0, identity') is None
+    assert get_compressor('deflate, gzip;q=0.5') is GzipCompressor
+    assert get_compressor('*').encoding in ('br', 'gzip')
+
+
+@pytest.mark.django_db
+class TestCompression:
+
+    def test_gzip(self, client, titles):
+        plain = client.get('/api/v1/titles/')
+        response = client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        assert 'gzip' not in plain.get('Content-Encoding', '')
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        assert gzip.decompress(response.content) == plain.content
+        assert response['ETag'] == f'W/{plain["ETag"]}'
+
+    def test_weak_etag_not_modified(self, client, titles):
+        response = client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        response = client.get(
+            '/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        assert response.status_code == 304
+
+    def test_brotli(self, client, titles):
+        brotli = pytest.importorskip('brotli')
+        plain = client.get('/api/v1/titles/')
+        response = client.get(
+            '/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        assert response['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.content) == plain.content
+
+    def test_threshold_and_content_type(self, client, settings, titles):
+        settings.COMPRESSION_MIN_SIZE = 10 ** 6
+        response = client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding')
+        settings.COMPRESSION_MIN_SIZE = 0
+        settings.COMPRESSION_CONTENT_TYPES = ['text/csv']
+        response = client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding')
+
+    def test_streaming(self, client, settings, titles):
+        settings.API_STREAM_PAGE_SIZE = 1
+        params = {'page_size': 25}
+        plain = client.get('/api/v1/titles/', params)
+        response = client.get(
+            '/api/v1/titles/', params, HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert response.streaming
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(
+            b''.join(response.streaming_content)
+        ) == b''.join(plain.streaming_content)
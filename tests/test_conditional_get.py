@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_reviews_not_modified(self, client, user_client, create_titles):
+        title, = create_titles(1)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert response.has_header('ETag')
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что неизменившийся список отзывов отдаётся '
+            'со статусом 304'
+        )
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что для ответа 304 страница отзывов не выбирается'
+        )
+
+        user_client.post(url, {'text': 'Отзыв', 'score': 5})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_review_edit_changes_etag(self, user_client, create_titles):
+        title, = create_titles(1)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        review_id = user_client.post(
+            url, {'text': 'Отзыв', 'score': 5}
+        ).json()['id']
+        etag = user_client.get(f'{url}{review_id}/')['ETag']
+        user_client.patch(f'{url}{review_id}/', {'text': 'Другой текст'})
+        response = user_client.get(
+            f'{url}{review_id}/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+
+    def test_title_if_modified_since(self, client, create_titles):
+        title, = create_titles(1)
+        url = f'/api/v1/titles/{title.pk}/'
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+        assert client.get('/api/v1/titles/0/').status_code == 404
+
+    def test_cached_title_not_modified(self, client, create_titles):
+        create_titles(1)
+        etag = client.get('/api/v1/titles/')['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['X-Cache'] == 'HIT'
+        assert len(context.captured_queries) == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_category_rename_changes_title_etag(self, client,
+                                                create_titles):
+        title, = create_titles(1)
+        url = f'/api/v1/titles/{title.pk}/'
+        etag = client.get(url)['ETag']
+        title.category.name = 'Кино'
+        title.category.save()
+        genre = title.genre.first()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что переименование категории меняет ETag '
+            'произведений'
+        )
+        assert response.json()['category']['name'] == 'Кино'
+        etag = response['ETag']
+        genre.slug = 'drama-2'
+        genre.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_username_change_changes_review_etag(self, client, user,
+                                                 create_titles):
+        from reviews.models import Review
+
+        title, = create_titles(1)
+        Review.objects.create(title=title, author=user, text='Да', score=5)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = client.get(url)['ETag']
+        user.bio = 'Без смены имени'
+        user.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        user.username = 'Renamed'
+        user.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['results'][0]['author'] == 'Renamed'
@@ -0,0 +1,107 @@
+import csv
+import json
+import os
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def read(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return file.read()
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        reader = csv.DictReader(file)
+        return reader.fieldnames, {row['id']: row for row in reader}
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_dump_bd_matches_source_files(self, tmp_path):
+        from reviews.csv_data import TABLES
+
+        call_command('fill_bd', '--bulk', stdout=StringIO())
+        call_command(
+            'dump_bd', '--path', str(tmp_path), '--chunk-size', '7',
+            stdout=StringIO()
+        )
+        for table in TABLES:
+            headers, rows = read_rows(tmp_path / table.filename)
+            source_headers, source_rows = read_rows(
+                os.path.join(DATA_DIR, table.filename)
+            )
+            assert headers == source_headers
+            assert len(rows) == table.model.objects.count()
+            for pk, row in rows.items():
+                assert row == source_rows[pk], (
+                    f'Проверьте, что {table.filename} выгружается '
+                    f'в исходном виде'
+                )
+
+    def test_dump_bd_ndjson(self, tmp_path):
+        from reviews.models import Review
+
+        call_command('fill_bd', '--bulk', stdout=StringIO())
+        call_command(
+            'dump_bd', '--path', str(tmp_path), '--format', 'ndjson',
+            '--tables', 'review', stdout=StringIO()
+        )
+        rows = [
+            json.loads(line)
+            for line in read(tmp_path / 'review.ndjson').splitlines()
+        ]
+        assert len(rows) == Review.objects.count()
+        assert set(rows[0]) == {
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        }
+
+    def test_export_endpoint(self, admin_client, user_client, client,
+                             create_titles):
+        create_titles(3)
+        url = '/api/v1/export/titles.csv'
+        assert client.get(url).status_code == 401
+        assert user_client.get(url).status_code == 403
+        assert admin_client.get(
+            '/api/v1/export/users.csv'
+        ).status_code == 404
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0] == 'id,name,year,category'
+        assert len(lines) == 4
+        response = admin_client.get('/api/v1/export/genre_title.ndjson')
+        rows = [
+            json.loads(line) for line in
+            b''.join(response.streaming_content).decode().splitlines()
+        ]
+        assert len(rows) == 6
+
+    def test_export_accept_header(self, admin_client, client, create_titles):
+        create_titles(2)
+        response = admin_client.get(
+            '/api/v1/export/titles.csv', HTTP_ACCEPT='text/csv'
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что выгрузка не отвечает 406 на Accept: text/csv'
+        )
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 3
+        response = admin_client.get(
+            '/api/v1/export/titles.ndjson',
+            HTTP_ACCEPT='application/x-ndjson'
+        )
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        response = client.get(
+            '/api/v1/export/titles.csv', HTTP_ACCEPT='text/csv'
+        )
+        assert response.status_code == 401
@@ -0,0 +1,66 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestTitleFacets:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self, create_titles):
+        from reviews.models import Category, Genre
+
+        titles = create_titles(5)
+        book = Category.objects.create(name='Книга', slug='book')
+        poetry = Genre.objects.create(name='Поэзия', slug='poetry')
+        for title in titles[:2]:
+            title.category = book
+            title.year = 1990
+            title.save()
+            title.genre.set([poetry])
+        return titles
+
+    def test_facet_counts(self, client, titles):
+        response = client.get(self.url, {'facets': 'genre,category,year'})
+        assert response.status_code == 200
+        facets = response.json()['facets']
+        assert facets['genre'] == [
+            {'slug': 'comedy', 'name': 'Комедия', 'count': 3},
+            {'slug': 'drama', 'name': 'Драма', 'count': 3},
+            {'slug': 'poetry', 'name': 'Поэзия', 'count': 2},
+        ]
+        assert facets['category'] == [
+            {'slug': 'movie', 'name': 'Фильм', 'count': 3},
+            {'slug': 'book', 'name': 'Книга', 'count': 2},
+        ]
+        assert facets['year'] == [
+            {'year': 2000, 'count': 3}, {'year': 1990, 'count': 2},
+        ]
+
+    def test_facets_follow_filters(self, client, titles):
+        response = client.get(
+            self.url, {'facets': 'genre,category', 'genre': 'poetry'}
+        )
+        facets = response.json()['facets']
+        assert facets['genre'] == [
+            {'slug': 'poetry', 'name': 'Поэзия', 'count': 2}
+        ]
+        assert facets['category'] == [
+            {'slug': 'book', 'name': 'Книга', 'count': 2}
+        ]
+
+    def test_one_query_per_facet(self, client, titles):
+        with CaptureQueriesContext(connection) as context:
+            client.get(self.url)
+        without_facets = len(context.captured_queries)
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            client.get(self.url, {'facets': 'genre,category,year'})
+        assert len(context.captured_queries) == without_facets + 3
+
+    def test_unknown_facet(self, client):
+        response = client.get(self.url, {'facets': 'genre,author'})
+        assert response.status_code == 400
+        assert 'facets' in response.json()
@@ -0,0 +1,84 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture
+def catalog(create_titles, user, admin):
+    from reviews.models import Comment, Review
+
+    titles = create_titles(3)
+    titles[2].category = None
+    titles[2].description = 'Описание со строкой\u2028внутри'
+    titles[2].save()
+    titles[1].genre.clear()
+    review = Review.objects.create(
+        title=titles[0], author=user, text='Отзыв', score=7
+    )
+    Review.objects.create(title=titles[0], author=admin, text='Ещё', score=3)
+    Comment.objects.create(review=review, author=admin, text='Комментарий')
+    return titles[0], review
+
+
+def get_both(client, settings, url, params=None):
+    responses = []
+    for fast in (False, True):
+        settings.API_FAST_SERIALIZATION = fast
+        cache.clear()
+        response = client.get(url, params)
+        assert response.status_code == 200
+        responses.append(response)
+    return responses
+
+
+@pytest.mark.django_db
+class TestValuesFastPath:
+
+    def test_plans_compile(self):
+        from api.fastpath import compile_plan
+        from api.serializers import (CommentSerializer, ReviewSerializer,
+                                     TitleSerializer)
+
+        for serializer_class in (
+            TitleSerializer, ReviewSerializer, CommentSerializer
+        ):
+            serializer = serializer_class()
+            assert compile_plan(
+                serializer.Meta.model, serializer.fields
+            ) is not None
+
+    @pytest.mark.parametrize('params', [
+        None, {'fields': 'name,genre'}, {'omit': 'category'},
+        {'pagination': 'cursor'}, {'genre': 'drama'},
+    ])
+    def test_titles_match_serializer(self, client, settings, catalog,
+                                     params):
+        slow, fast = get_both(client, settings, '/api/v1/titles/', params)
+        assert fast.json() == slow.json()
+        assert fast.content == slow.content
+
+    def test_reviews_and_comments_match_serializer(self, client, settings,
+                                                   catalog):
+        title, review = catalog
+        for url in (
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        ):
+            slow, fast = get_both(client, settings, url)
+            assert fast.content == slow.content
+
+    def test_json_parser(self, admin_client):
+        from reviews.models import Category
+
+        Category.objects.create(name='Фильм', slug='movie')
+        response = admin_client.post(
+            '/api/v1/titles/',
+            data='{"name": "Новое", "year": 2000, "category": "movie", '
+                 '"genre": []}',
+            content_type='application/json'
+        )
+        assert response.status_code == 201
+        response = admin_client.post(
+            '/api/v1/titles/', data='{"name": ',
+            content_type='application/json'
+        )
+        assert response.status_code == 400
@@ -0,0 +1,74 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def csv_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db
+class TestFillBd:
+
+    def test_bulk_load(self):
+        from django.db.models import Count
+        from reviews.models import Category, Review, Title
+
+        call_command('fill_bd', '--bulk', '--batch-size', '10',
+                     stdout=StringIO())
+        assert Title.objects.count() == len(csv_rows('titles.csv'))
+        assert Review.objects.count() == len(csv_rows('review.csv'))
+        first = csv_rows('review.csv')[0]
+        review = Review.objects.get(pk=first['id'])
+        assert review.pub_date.isoformat().startswith(first['pub_date'][:19]), (
+            'Проверьте, что при пакетной загрузке сохраняется дата из файла'
+        )
+        title = Title.objects.get(pk=first['title_id'])
+        assert title.rating_count == title.reviews.count()
+        for title in Title.objects.annotate(count=Count('reviews')):
+            assert title.rating_count == title.count, (
+                'Проверьте, что рейтинг пересчитывается во всех пачках '
+                'произведений'
+            )
+        stdout = StringIO()
+        call_command('fill_bd', '--bulk', stdout=stdout)
+        assert Title.objects.count() == len(csv_rows('titles.csv')), (
+            'Проверьте, что повторная загрузка не создаёт дубликатов'
+        )
+        assert 'titles.csv: 0 строк' in stdout.getvalue(), (
+            'Проверьте, что уже существующие строки не считаются '
+            'загруженными'
+        )
+        assert Category.objects.create(name='Новая', slug='new').pk > max(
+            int(row['id']) for row in csv_rows('category.csv')
+        )
+
+    def test_dependency_levels(self):
+        from reviews.csv_data import TABLES, dependency_levels
+
+        levels = [
+            {table.filename for table in level}
+            for level in dependency_levels(list(reversed(TABLES)))
+        ]
+        assert levels == [
+            {'category.csv', 'genre.csv', 'users.csv'},
+            {'titles.csv'},
+            {'genre_title.csv', 'review.csv'},
+            {'comments.csv'},
+        ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_load():
+    from reviews.models import Comment, GenreTitle
+
+    call_command('fill_bd', '--bulk', '--workers', '3', stdout=StringIO())
+    assert Comment.objects.count() == len(csv_rows('comments.csv'))
+    assert GenreTitle.objects.count() == len(csv_rows('genre_title.csv'))
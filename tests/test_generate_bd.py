@@ -0,0 +1,62 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+VOLUMES = (
+    '--users', '20', '--titles', '15', '--reviews', '120',
+    '--comments', '300', '--categories', '3', '--genres', '5',
+)
+
+
+def test_allocate():
+    from reviews.synthetic import allocate
+
+    counts = allocate(100, [1 / rank for rank in range(1, 11)], cap=20)
+    assert sum(counts) == 100
+    assert max(counts) == 20
+    assert counts == sorted(counts, reverse=True)
+    assert sum(allocate(1000, [1, 1], cap=20)) == 40
+    assert allocate(3, [0, 2, 1]) == [0, 2, 1]
+
+
+@pytest.mark.django_db
+class TestGenerateBd:
+
+    def test_generate_into_db(self):
+        from django.db.models import Count
+        from reviews.models import Comment, Review, Title
+        from users.models import User
+
+        call_command('generate_bd', *VOLUMES, '--batch-size', '50',
+                     stdout=StringIO())
+        assert User.objects.count() == 20
+        assert Title.objects.count() == 15
+        assert Review.objects.count() == 120
+        assert Comment.objects.count() == 300
+        counts = sorted(
+            Title.objects.order_by().annotate(
+                count=Count('reviews')
+            ).values_list('count', flat=True),
+            reverse=True
+        )
+        assert counts[0] > 3 * counts[len(counts) // 2], (
+            'Проверьте, что число отзывов на произведение распределено '
+            'неравномерно'
+        )
+        title = Title.objects.order_by('-rating_count').first()
+        assert title.rating_count == title.reviews.count()
+
+    def test_csv_is_deterministic_and_loadable(self, tmp_path):
+        from reviews.models import Review
+
+        for path in (tmp_path / 'a', tmp_path / 'b'):
+            call_command('generate_bd', *VOLUMES, '--seed', '7',
+                         '--path', str(path), stdout=StringIO())
+        for name in ('users.csv', 'review.csv', 'comments.csv'):
+            assert (tmp_path / 'a' / name).read_bytes() == (
+                tmp_path / 'b' / name
+            ).read_bytes()
+        call_command('fill_bd', '--bulk', '--path', str(tmp_path / 'a'),
+                     stdout=StringIO())
+        assert Review.objects.count() == 120
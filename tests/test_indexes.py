@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='Планы запросов проверяются только на PostgreSQL'
+)
+
+
+def get_query_shapes(title, review):
+    from reviews.models import Comment, GenreTitle, Review, Title
+    from users.models import User
+
+    return {
+        'titles': (
+            Title.objects.order_by('name', 'id')[:20], 'reviews_title'
+        ),
+        'titles_by_name': (
+            Title.objects.filter(name=title.name).order_by('name'),
+            'reviews_title'
+        ),
+        'titles_by_category': (
+            Title.objects.filter(category=title.category_id).order_by('name'),
+            'reviews_title'
+        ),
+        'titles_by_genre': (
+            GenreTitle.objects.filter(genre=1).values('title'),
+            'reviews_genretitle'
+        ),
+        'genres_of_title': (
+            GenreTitle.objects.filter(title=title).values('genre'),
+            'reviews_genretitle'
+        ),
+        'reviews': (
+            Review.objects.filter(title=title).order_by('-pub_date', '-id')
+            [:20],
+            'reviews_review'
+        ),
+        'comments': (
+            Comment.objects.filter(review=review).order_by('-pub_date', '-id')
+            [:20],
+            'reviews_comment'
+        ),
+        'users_by_role': (
+            User.objects.filter(role='admin'), 'users_user'
+        ),
+    }
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    @pytest.fixture
+    def seeded(self, create_titles, user, admin):
+        from reviews.models import Comment, Review
+
+        titles = create_titles(30)
+        reviews = Review.objects.bulk_create(
+            Review(title=title, author=author, text='Отзыв', score=5)
+            for title in titles for author in (user, admin)
+        )
+        review = Review.objects.filter(title=titles[0]).first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text='Комментарий')
+            for _ in range(len(reviews))
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            # На маленькой таблице планировщик и так выбрал бы полный
+            # просмотр и сортировку: запрещаем их, чтобы проверить,
+            # что у запросов вообще есть подходящий индекс.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_sort = off')
+        return titles[0], review
+
+    @pytest.mark.parametrize('shape', [
+        'titles', 'titles_by_name', 'titles_by_category', 'titles_by_genre',
+        'genres_of_title', 'reviews', 'comments', 'users_by_role',
+    ])
+    def test_no_seq_scan(self, seeded, shape):
+        queryset, table = get_query_shapes(*seeded)[shape]
+        plan = queryset.explain()
+        assert f'Seq Scan on {table}' not in plan, (
+            f'Запрос {shape} читает {table} последовательно, '
+            f'проверьте индексы:\n{plan}'
+        )
+
+    @pytest.mark.parametrize('shape', ['titles', 'reviews', 'comments'])
+    def test_ordering_from_index(self, seeded, shape):
+        queryset, _ = get_query_shapes(*seeded)[shape]
+        plan = queryset.explain()
+        assert 'Sort' not in plan, (
+            f'Порядок запроса {shape} должен браться из индекса:\n{plan}'
+        )
@@ -0,0 +1,129 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+
+def scrape(client):
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def delta(before, after, name):
+    return after.get(name, 0) - before.get(name, 0)
+
+
+LIST_LABELS = 'view="TitleViewSet",action="list"'
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_request_metrics(self, client, create_titles):
+        create_titles(2)
+        before = scrape(client)
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        after = scrape(client)
+        labels = f'{LIST_LABELS},method="GET",status="200"'
+        assert delta(before, after, (
+            f'yamdb_http_request_duration_seconds_count{{{labels}}}'
+        )) == 2
+        assert delta(before, after, (
+            f'yamdb_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'
+        )) == 2
+        assert delta(before, after, (
+            f'yamdb_http_response_bytes_total{{{LIST_LABELS}}}'
+        )) > 0
+        assert delta(before, after, (
+            f'yamdb_db_queries_total{{{LIST_LABELS}}}'
+        )) > 0
+        for result in ('hit', 'miss'):
+            assert delta(before, after, (
+                f'yamdb_cache_requests_total{{view="titles",'
+                f'result="{result}"}}'
+            )) == 1
+
+    def test_email_enqueue_latency(self, client):
+        name = 'yamdb_email_enqueue_duration_seconds_count'
+        before = scrape(client)
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'metrics', 'email': 'metrics@yamdb.fake'
+        })
+        assert response.status_code == 200
+        assert delta(before, scrape(client), name) == 1
+
+    def test_disabled(self, client, settings):
+        settings.METRICS_ENABLED = False
+        assert client.get('/metrics').status_code == 404
+
+    def test_access(self, client, settings):
+        remote = {'REMOTE_ADDR': '203.0.113.7'}
+        assert client.get('/metrics', **remote).status_code == 403
+        settings.METRICS_TOKEN = 'scrape-token'
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer wrong', **remote
+        ).status_code == 403
+        assert client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer scrape-token', **remote
+        ).status_code == 200
+
+
+def increment_in_child():
+    from api.metrics import EMAIL_SEND_DURATION, registry
+
+    EMAIL_SEND_DURATION.observe(0.2, result='sent')
+    registry.flush()
+
+
+@pytest.mark.django_db
+def test_aggregates_processes(client, settings, tmp_path):
+    from api.metrics import ARCHIVE_FILENAME
+
+    settings.METRICS_DIR = str(tmp_path)
+    name = 'yamdb_email_send_duration_seconds_count{result="sent"}'
+    before = scrape(client)
+    process = multiprocessing.get_context('fork').Process(
+        target=increment_in_child
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert delta(before, scrape(client), name) == 1
+    assert ARCHIVE_FILENAME in os.listdir(tmp_path), (
+        'Проверьте, что метрики завершившихся процессов переносятся в архив'
+    )
+    assert delta(before, scrape(client), name) == 1
+
+
+def increment_and_idle():
+    from api.metrics import EMAIL_SEND_DURATION
+
+    EMAIL_SEND_DURATION.observe(0.2, result='sent')
+    time.sleep(0.5)
+
+
+@pytest.mark.django_db
+def test_idle_process_flushed(client, settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    settings.METRICS_FLUSH_INTERVAL = 0.05
+    name = 'yamdb_email_send_duration_seconds_count{result="sent"}'
+    before = scrape(client)
+    process = multiprocessing.get_context('fork').Process(
+        target=increment_and_idle
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert delta(before, scrape(client), name) == 1, (
+        'Проверьте, что значения процесса без запросов сохраняются '
+        'в METRICS_DIR фоновым потоком'
+    )
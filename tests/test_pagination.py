@@ -0,0 +1,62 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def collect(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не считает общее '
+                'количество записей'
+            )
+            ids += [item['id'] for item in data['results']]
+            url = data['next']
+        return ids
+
+    def test_reviews_cursor_pagination(self, client, create_titles,
+                                       django_user_model):
+        from reviews.models import Review
+
+        title, = create_titles(1)
+        reviews = Review.objects.bulk_create(
+            Review(
+                title=title,
+                author=django_user_model.objects.create_user(
+                    username=f'author{number}',
+                    email=f'author{number}@yamdb.fake'
+                ),
+                text='Отзыв',
+                score=5
+            )
+            for number in range(25)
+        )
+        Review.objects.update(pub_date='2020-01-01T00:00:00Z')
+        ids = self.collect(
+            client, f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor'
+        )
+        assert ids == sorted(
+            Review.objects.values_list('id', flat=True), reverse=True
+        ), (
+            'Проверьте, что курсорная пагинация отзывов возвращает каждый '
+            'отзыв ровно один раз при совпадающей дате публикации'
+        )
+        assert len(ids) == len(reviews)
+
+    def test_titles_cursor_pagination(self, client, create_titles):
+        titles = create_titles(25)
+        ids = self.collect(client, '/api/v1/titles/?pagination=cursor')
+        assert ids == [
+            title.pk for title in sorted(
+                titles, key=lambda title: (title.name, title.pk)
+            )
+        ]
+
+    def test_invalid_cursor(self, client, create_titles):
+        create_titles(1)
+        response = client.get('/api/v1/titles/?cursor=invalid')
+        assert response.status_code == 404
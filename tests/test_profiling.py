@@ -0,0 +1,89 @@
+import json
+import logging
+
+import pytest
+
+
+@pytest.fixture
+def profiling(settings, monkeypatch, caplog):
+    from api.profiling import logger
+
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 1
+    settings.PROFILING_SLOW_REQUEST_MS = 10 ** 6
+    monkeypatch.setattr(logger, 'propagate', True)
+    caplog.set_level(logging.INFO, logger='api.profiling')
+    return caplog
+
+
+def get_records(caplog):
+    return [
+        json.loads(record.getMessage()) for record in caplog.records
+        if record.name == 'api.profiling'
+    ]
+
+
+def test_fingerprint():
+    from api.profiling import fingerprint
+
+    assert fingerprint(
+        'SELECT * FROM t WHERE id IN (%s, %s, %s) AND a = %s LIMIT 21'
+    ) == fingerprint('SELECT * FROM t WHERE id IN (%s) AND a = %s LIMIT 5')
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+
+    def test_disabled_by_default(self, client, settings, caplog):
+        response = client.get('/api/v1/titles/')
+        assert not response.has_header('Server-Timing')
+        assert not get_records(caplog)
+
+    def test_request_record(self, client, profiling, create_titles):
+        create_titles(2)
+        response = client.get('/api/v1/titles/')
+        assert 'db;dur=' in response['Server-Timing']
+        record, = get_records(profiling)
+        assert record['event'] == 'request'
+        assert record['view'] == 'TitleViewSet'
+        assert record['action'] == 'list'
+        assert record['url_name'] == 'titles-list'
+        assert record['queries'] > 0
+        assert 'top_queries' not in record
+
+    def test_slow_request_record(self, client, settings, profiling,
+                                 create_titles):
+        from reviews.models import Title
+
+        title, = create_titles(1)
+        settings.PROFILING_SLOW_REQUEST_MS = 0
+        settings.PROFILING_TOP_QUERIES = 2
+        client.get(f'/api/v1/titles/{title.pk}/')
+        record, = get_records(profiling)
+        assert record['event'] == 'slow_request'
+        assert record['action'] == 'retrieve'
+        assert len(record['top_queries']) == 2
+        assert Title._meta.db_table in ' '.join(
+            query['sql'] for query in record['top_queries']
+        )
+
+    def test_sampling(self, client, settings, profiling):
+        settings.PROFILING_SAMPLE_RATE = 0
+        response = client.get('/api/v1/titles/')
+        assert not response.has_header('Server-Timing')
+        assert not get_records(profiling)
+
+
+def test_duplicates():
+    from api.profiling import RequestProfile
+
+    profile = RequestProfile()
+    for pk in (1, 2, 3):
+        profile(
+            lambda *args: None, f'SELECT name FROM t WHERE id = {pk}',
+            None, False, {}
+        )
+    profile(lambda *args: None, 'SELECT 1 FROM u', None, False, {})
+    assert profile.duplicates() == [
+        {'fingerprint': 'SELECT name FROM t WHERE id = ?', 'count': 3}
+    ]
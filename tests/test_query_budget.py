@@ -0,0 +1,96 @@
+import json
+import logging
+
+import pytest
+from rest_framework.test import APIClient
+
+
+def get_records(caplog):
+    return [
+        json.loads(record.getMessage()) for record in caplog.records
+        if record.name == 'api.query_budget'
+    ]
+
+
+@pytest.fixture
+def over_budget(monkeypatch):
+    from api.views import TitleViewSet
+
+    monkeypatch.setattr(TitleViewSet, 'query_budget', {'list': 1})
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('fast', (True, False))
+    def test_budgets_hold_for_many_rows(self, user, django_user_model,
+                                        settings, create_titles, fast):
+        from reviews.models import Comment, Review
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        settings.API_FAST_SERIALIZATION = fast
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            for number in range(5)
+        ]
+        titles = create_titles(3)
+        for title in titles:
+            for author in authors:
+                review = Review.objects.create(
+                    title=title, author=author, text='Отзыв', score=5
+                )
+                for commenter in authors:
+                    Comment.objects.create(
+                        review=review, author=commenter, text='Да'
+                    )
+        title = titles[0]
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+        review = title.reviews.first()
+        review_url = f'{reviews_url}{review.pk}/'
+        for url in (
+            '/api/v1/titles/', f'/api/v1/titles/{title.pk}/',
+            '/api/v1/titles/?facets=genre,category', reviews_url,
+            f'{reviews_url}?pagination=cursor', review_url,
+            f'{review_url}comments/',
+            f'{review_url}comments/?pagination=cursor',
+            f'{review_url}comments/{review.comments.first().pk}/',
+        ):
+            response = client.get(url)
+            assert response.status_code == 200, url
+        results = client.get(f'{review_url}comments/').json()['results']
+        assert {item['author'] for item in results} == {
+            author.username for author in authors
+        }
+
+    def test_raises_when_exceeded(self, client, over_budget):
+        from api.mixins import QueryBudgetError
+
+        with pytest.raises(QueryBudgetError, match='TitleViewSet.list'):
+            client.get('/api/v1/titles/')
+
+    def test_logs_when_exceeded(self, client, settings, monkeypatch, caplog,
+                                over_budget, create_titles):
+        from api.mixins import logger
+
+        settings.QUERY_BUDGET_RAISE = False
+        monkeypatch.setattr(logger, 'propagate', True)
+        create_titles(2)
+        assert client.get('/api/v1/titles/').status_code == 200
+        record, = get_records(caplog)
+        assert record['event'] == 'query_budget_exceeded'
+        assert record['action'] == 'list'
+        assert record['budget'] == 1
+        assert record['queries'] == len(record['sql']) > 1
+
+    def test_other_actions_not_limited(self, client, over_budget, caplog):
+        caplog.set_level(logging.WARNING, logger='api.query_budget')
+        assert client.get(
+            '/api/v1/titles/suggest/', {'prefix': 'П'}
+        ).status_code == 200
+        assert not get_records(caplog)
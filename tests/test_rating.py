@@ -0,0 +1,51 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRating:
+
+    def get_title(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        return response.json()
+
+    def post_review(self, client, title, score):
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': score}
+        )
+        assert response.status_code == 201
+        return response.json()['id']
+
+    def test_create_update_delete(self, user_client, admin_client,
+                                  create_titles):
+        title, = create_titles(1)
+        review_id = self.post_review(user_client, title, 4)
+        self.post_review(admin_client, title, 8)
+        assert self.get_title(user_client, title)['rating'] == 6
+
+        url = f'/api/v1/titles/{title.id}/reviews/{review_id}/'
+        response = user_client.patch(url, data={'score': 10})
+        assert response.status_code == 200
+        assert self.get_title(user_client, title)['rating'] == 9
+
+        assert user_client.delete(url).status_code == 204
+        assert self.get_title(user_client, title)['rating'] == 8, (
+            'Проверьте, что удаление отзыва убирает его оценку из рейтинга'
+        )
+
+    def test_user_delete(self, user_client, admin_client, create_titles):
+        from reviews.models import Title
+
+        title, = create_titles(1)
+        self.post_review(user_client, title, 2)
+        self.post_review(admin_client, title, 6)
+
+        response = admin_client.delete('/api/v1/users/TestUser/')
+        assert response.status_code == 204
+        title = Title.objects.get(pk=title.pk)
+        assert (title.rating_sum, title.rating_count) == (6, 1), (
+            'Проверьте, что при удалении пользователя оценки его отзывов '
+            'убираются из рейтинга'
+        )
+        assert self.get_title(admin_client, title)['rating'] == 6
@@ -0,0 +1,115 @@
+import pytest
+from django.db import connection
+
+
+@pytest.fixture
+def search_data(user, admin):
+    from reviews.models import Category, Review, Title
+
+    category = Category.objects.create(name='Книга', slug='book')
+    dune = Title.objects.create(
+        name='Дюна', year=1965, category=category,
+        description='Пустынная планета Арракис и пряность'
+    )
+    solaris = Title.objects.create(
+        name='Солярис', year=1961, category=category,
+        description='Океан на далёкой планете'
+    )
+    review = Review.objects.create(
+        title=solaris, author=user, score=8,
+        text='Лучше, чем Дюна, хотя пряность тоже хороша'
+    )
+    Review.objects.create(
+        title=dune, author=admin, score=9, text='Классика фантастики'
+    )
+    return dune, solaris, review
+
+
+def test_inverted_index():
+    from api.search import InvertedIndex
+
+    index = InvertedIndex()
+    index.add('title', 1, 1, 'Дюна', [('Дюна', 'A'), ('Пряность', 'B')])
+    index.add('review', 5, 2, 'Дюна?', [('Дюна? Нет, Солярис', 'C')])
+    assert [
+        (result['kind'], result['id']) for result in index.search('дюна')
+    ] == [('title', 1), ('review', 5)]
+    assert index.search('дюна солярис')[0]['id'] == 5
+    assert index.search('дюна марс') == []
+    assert index.search('!!!') == []
+
+
+@pytest.mark.django_db
+def test_fallback_index_from_db(search_data):
+    from api.search import build_index
+
+    dune, solaris, review = search_data
+    results = build_index().search('Пряность')
+    assert [(result['kind'], result['id']) for result in results] == [
+        ('title', dune.id), ('review', review.id)
+    ]
+    assert results[1]['title_pk'] == solaris.id
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSearchEndpoint:
+    url = '/api/v1/search/'
+
+    def test_requires_query(self, client):
+        assert client.get(self.url).status_code == 400
+        assert client.get(self.url, {'q': ' '}).status_code == 400
+
+    def test_ranked_results(self, client, search_data):
+        dune, solaris, review = search_data
+        response = client.get(self.url, {'q': 'дюна'})
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 2
+        assert [(item['type'], item['id']) for item in data['results']] == [
+            ('title', dune.id), ('review', review.id)
+        ], 'Совпадение в названии должно быть выше совпадения в отзыве'
+        assert data['results'][1]['title_id'] == solaris.id
+        assert data['results'][0]['text'] == 'Дюна'
+
+    def test_results_follow_updates(self, client, search_data):
+        dune, _, _ = search_data
+        assert client.get(self.url, {'q': 'марс'}).json()['count'] == 0
+        dune.description = 'Вовсе не Марс'
+        dune.save()
+        results = client.get(self.url, {'q': 'марс'}).json()['results']
+        assert [item['id'] for item in results] == [dune.id]
+
+    def test_paginated(self, client, create_titles):
+        create_titles(25)
+        response = client.get(self.url, {'q': 'произведение'})
+        data = response.json()
+        assert data['count'] == 25
+        assert len(data['results']) == 20
+        assert data['next'] is not None
+
+
+@pytest.mark.django_db
+def test_search_vector_not_in_title_response(client, search_data):
+    dune, _, _ = search_data
+    response = client.get(f'/api/v1/titles/{dune.pk}/')
+    assert 'search_vector' not in response.json()
+    assert 'search_vector' not in client.get('/api/v1/titles/').json()[
+        'results'
+    ][0]
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='GIN-индекс создаётся только на PostgreSQL'
+)
+@pytest.mark.django_db
+def test_search_uses_gin_index(search_data):
+    from django.contrib.postgres.search import SearchQuery
+    from reviews.models import Title
+
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+    plan = Title.objects.filter(
+        search_vector=SearchQuery('дюна', config='russian')
+    ).order_by().explain()
+    assert 'title_search_vector_idx' in plan
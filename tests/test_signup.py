@@ -0,0 +1,166 @@
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+class TestSignupEmailQueue:
+
+    def test_signup_enqueues_email(self, client, mailoutbox):
+        from users.models import OutgoingEmail, User
+
+        response = client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'newuser', 'email': 'newuser@yamdb.fake'}
+        )
+        assert response.status_code == 200
+        assert mailoutbox == [], (
+            'Проверьте, что регистрация не отправляет письмо синхронно'
+        )
+        email = OutgoingEmail.objects.get()
+        user = User.objects.get(username='newuser')
+        assert user.confirmation_code in email.message
+
+        call_command('send_emails')
+        assert len(mailoutbox) == 1
+        assert mailoutbox[0].to == ['newuser@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent is not None
+        assert email.attempts == 1
+
+
+@pytest.mark.django_db
+class TestSendEmails:
+
+    @pytest.fixture
+    def email(self):
+        from users.models import OutgoingEmail
+
+        return OutgoingEmail.objects.create(
+            subject='Код', message='123', from_email='yamdb@yamdb.fake',
+            recipient='newuser@yamdb.fake'
+        )
+
+    def test_failed_send_backs_off(self, email, mailoutbox, monkeypatch):
+        from django.core.mail import EmailMessage
+
+        def fail(self):
+            raise OSError('SMTP недоступен')
+
+        monkeypatch.setattr(EmailMessage, 'send', fail)
+        call_command('send_emails', '--backoff', '60')
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Проверьте, что неотправленное письмо не повторяется сразу'
+        )
+        assert email.last_error == 'SMTP недоступен'
+        delay = (email.next_attempt - timezone.now()).total_seconds()
+        assert 50 < delay <= 60
+
+        monkeypatch.undo()
+        call_command('send_emails')
+        assert mailoutbox == []
+        email.next_attempt = timezone.now()
+        email.save()
+        call_command('send_emails')
+        assert len(mailoutbox) == 1
+
+    def test_connection_refused(self, email, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        def refuse(self):
+            raise ConnectionRefusedError('Connection refused')
+
+        monkeypatch.setattr(EmailBackend, 'open', refuse)
+        call_command('send_emails', '--backoff', '10')
+        email.refresh_from_db()
+        assert email.sent is None
+        assert email.attempts == 1
+        assert 'refused' in email.last_error
+        assert email.next_attempt > timezone.now()
+
+    def test_reconnect_after_disconnect(self, email, settings, monkeypatch):
+        import smtplib
+
+        from users.models import OutgoingEmail
+
+        OutgoingEmail.objects.create(
+            subject='Код', message='456', from_email='yamdb@yamdb.fake',
+            recipient='other@yamdb.fake'
+        )
+        delivered = []
+
+        class FakeSMTP:
+            connections = 0
+
+            def __init__(self, *args, **kwargs):
+                FakeSMTP.connections += 1
+                self.alive = FakeSMTP.connections > 1
+
+            def sendmail(self, from_email, recipients, message):
+                if not self.alive:
+                    raise smtplib.SMTPServerDisconnected('Connection lost')
+                delivered.extend(recipients)
+
+            def quit(self):
+                if not self.alive:
+                    raise smtplib.SMTPServerDisconnected('Connection lost')
+
+            def close(self):
+                pass
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        monkeypatch.setattr(smtplib, 'SMTP', FakeSMTP)
+        call_command('send_emails')
+        assert delivered == ['other@yamdb.fake'], (
+            'Проверьте, что после обрыва соединения остальные письма пачки '
+            'отправляются через новое соединение'
+        )
+        email.refresh_from_db()
+        assert email.sent is None
+        assert 'Connection lost' in email.last_error
+
+
+@pytest.mark.django_db
+class TestSignupQueries:
+    url = '/api/v1/auth/signup/'
+
+    def test_new_user_queries(self, client, django_assert_num_queries):
+        # Поиск по username/email, INSERT пользователя и письма в очередь,
+        # SAVEPOINT/RELEASE вокруг atomic.
+        with django_assert_num_queries(5):
+            response = client.post(
+                self.url,
+                {'username': 'newuser', 'email': 'newuser@yamdb.fake'},
+                content_type='application/json'
+            )
+        assert response.status_code == 200
+        assert response.json() == {
+            'username': 'newuser', 'email': 'newuser@yamdb.fake'
+        }
+
+    def test_existing_user_queries(self, client, user,
+                                   django_assert_num_queries):
+        old_code = user.confirmation_code
+        with django_assert_num_queries(5):
+            response = client.post(
+                self.url, {'username': user.username, 'email': user.email}
+            )
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.confirmation_code != old_code
+
+    def test_taken_username_and_email(self, client, user, admin):
+        response = client.post(
+            self.url, {'username': user.username, 'email': admin.email}
+        )
+        assert response.status_code == 400
+        assert set(response.json()) == {'username', 'email'}
+
+    def test_invalid_username(self, client, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            response = client.post(
+                self.url, {'username': 'me', 'email': 'me@yamdb.fake'}
+            )
+        assert response.status_code == 400
+        assert 'username' in response.json()
@@ -0,0 +1,100 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def get_with_queries(client, url, params=None):
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return response.json(), context.captured_queries
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_title_fields(self, client, create_titles):
+        create_titles(3)
+        data, full = get_with_queries(client, '/api/v1/titles/')
+        data, queries = get_with_queries(
+            client, '/api/v1/titles/', {'fields': 'id,name'}
+        )
+        assert [set(item) for item in data['results']] == [{'id', 'name'}] * 3
+        assert len(queries) == len(full) - 1, (
+            'Проверьте, что жанры не подгружаются, если их нет в ответе'
+        )
+        select = queries[-1]['sql']
+        assert 'description' not in select
+        assert 'reviews_category' not in select
+
+    @pytest.mark.parametrize('fast', (True, False))
+    def test_nested_fields_kept(self, client, settings, create_titles,
+                                fast):
+        settings.API_FAST_SERIALIZATION = fast
+        title, = create_titles(1)
+        params = {'fields': 'id,category,genre'}
+        expected = {
+            'id': title.pk,
+            'category': {'name': 'Фильм', 'slug': 'movie'},
+        }
+        data, _ = get_with_queries(client, '/api/v1/titles/', params)
+        item, = data['results']
+        assert {key: item[key] for key in expected} == expected, (
+            'Проверьте, что `?fields=` не урезает вложенные сериализаторы'
+        )
+        assert all(set(genre) == {'name', 'slug'} for genre in item['genre'])
+        data, _ = get_with_queries(
+            client, f'/api/v1/titles/{title.pk}/', params
+        )
+        assert {key: data[key] for key in expected} == expected
+
+    def test_title_omit(self, client, create_titles):
+        title, = create_titles(1)
+        data, queries = get_with_queries(
+            client, f'/api/v1/titles/{title.pk}/',
+            {'omit': 'description,genre'}
+        )
+        assert set(data) == {'id', 'name', 'year', 'rating', 'category'}
+        assert data['category'] == {'name': 'Фильм', 'slug': 'movie'}, (
+            'Проверьте, что вложенные сериализаторы не урезаются'
+        )
+        assert 'description' not in queries[-1]['sql']
+
+    def test_keyset_pagination_with_fields(self, client, create_titles):
+        create_titles(25)
+        data, _ = get_with_queries(
+            client, '/api/v1/titles/',
+            {'fields': 'year', 'pagination': 'cursor'}
+        )
+        assert len(data['results']) == 20
+        data, _ = get_with_queries(client, data['next'])
+        assert len(data['results']) == 5
+
+    def test_reviews_without_author(self, client, user, create_titles):
+        from reviews.models import Review
+
+        title, = create_titles(1)
+        Review.objects.create(title=title, author=user, text='Текст', score=7)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        data, queries = get_with_queries(client, url, {'fields': 'id,score'})
+        assert data['results'][0] == {
+            'id': data['results'][0]['id'], 'score': 7
+        }
+        select = queries[-1]['sql']
+        assert 'users_user' not in select and '"text"' not in select
+        data, _ = get_with_queries(client, url)
+        assert data['results'][0]['author'] == user.username
+
+    def test_writes_ignore_fields(self, admin_client):
+        from reviews.models import Category
+
+        Category.objects.create(name='Фильм', slug='movie')
+        response = admin_client.post(
+            '/api/v1/titles/?fields=id',
+            {'name': 'Новое', 'year': 2000, 'category': 'movie', 'genre': []},
+            format='json'
+        )
+        assert response.status_code == 201
+        assert response.json()['name'] == 'Новое'
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+from django.core.cache import cache
+
+
+def get_content(client, url, params):
+    cache.clear()
+    response = client.get(url, params)
+    assert response.status_code == 200
+    if response.streaming:
+        return True, b''.join(response.streaming_content)
+    return False, response.content
+
+
+@pytest.mark.django_db
+class TestStreamingLists:
+
+    @pytest.mark.parametrize('fast', [True, False])
+    @pytest.mark.parametrize('params', [
+        {'page_size': 3}, {'page_size': 3, 'page': 2},
+        {'page_size': 3, 'pagination': 'cursor'},
+        {'page_size': 3, 'facets': 'genre', 'fields': 'name,genre'},
+    ])
+    def test_stream_matches_regular_response(self, client, settings,
+                                             monkeypatch, create_titles,
+                                             fast, params):
+        monkeypatch.setattr('api.streaming.STREAM_CHUNK_SIZE', 2)
+        create_titles(5)
+        settings.API_FAST_SERIALIZATION = fast
+        streamed, regular = [], []
+        for threshold, result in ((1000, regular), (2, streamed)):
+            settings.API_STREAM_PAGE_SIZE = threshold
+            result.extend(get_content(client, '/api/v1/titles/', params))
+        assert streamed[0] and not regular[0]
+        assert streamed[1] == regular[1]
+
+    def test_stream_next_cursor(self, client, settings, create_titles):
+        create_titles(5)
+        settings.API_STREAM_PAGE_SIZE = 1
+        params = {'page_size': 2, 'pagination': 'cursor'}
+        names = []
+        url = '/api/v1/titles/'
+        while url:
+            response = client.get(url, params)
+            params = None
+            assert response.streaming
+            data = json.loads(b''.join(response.streaming_content))
+            names.extend(title['name'] for title in data['results'])
+            url = data['next']
+        assert len(names) == len(set(names)) == 5
+
+    def test_max_page_size(self, client, settings, create_titles):
+        create_titles(3)
+        settings.API_MAX_PAGE_SIZE = 2
+        response = client.get('/api/v1/titles/', {'page_size': 100})
+        assert len(response.json()['results']) == 2
+
+    def test_anonymous_page_size_capped(self, client, admin_client,
+                                        create_titles):
+        from reviews.models import Title
+
+        create_titles(1)
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000)
+            for number in range(1, 101)
+        )
+        params = {'page_size': 10000, 'pagination': 'cursor'}
+        response = client.get('/api/v1/titles/', params)
+        assert not response.streaming
+        assert len(response.json()['results']) == 100, (
+            'Проверьте, что анонимный запрос не получает страницу больше '
+            'API_MAX_PAGE_SIZE'
+        )
+        _, content = get_content(admin_client, '/api/v1/titles/', params)
+        assert len(json.loads(content)['results']) == 101
+
+    def test_not_streamed_with_indent(self, client, settings, create_titles):
+        create_titles(3)
+        settings.API_STREAM_PAGE_SIZE = 1
+        response = client.get(
+            '/api/v1/titles/', {'page_size': 2},
+            HTTP_ACCEPT='application/json; indent=2'
+        )
+        assert not response.streaming
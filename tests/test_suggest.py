@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def test_prefix_index():
+    from api.suggest import PrefixIndex
+
+    index = PrefixIndex([(1, 'Дюна'), (2, 'Дюнкерк'), (3, 'Солярис')])
+    assert index.suggest('дю', 10) == [
+        {'id': 1, 'name': 'Дюна'}, {'id': 2, 'name': 'Дюнкерк'}
+    ]
+    assert index.suggest('ДЮНК', 10) == [{'id': 2, 'name': 'Дюнкерк'}]
+    assert index.suggest('дю', 1) == [{'id': 1, 'name': 'Дюна'}]
+    assert index.suggest('я', 10) == []
+
+    index.add(4, 'Дюймовочка')
+    index.add(1, 'Арракис')
+    index.remove(2)
+    assert index.suggest('дю', 10) == [{'id': 4, 'name': 'Дюймовочка'}]
+    assert index.suggest('а', 10) == [{'id': 1, 'name': 'Арракис'}]
+    assert len(index) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSuggestEndpoint:
+    url = '/api/v1/titles/suggest/'
+
+    @pytest.fixture(autouse=True)
+    def reset_index(self):
+        from api.suggest import suggest_index
+
+        suggest_index.index = None
+
+    def test_requires_prefix(self, client):
+        assert client.get(self.url).status_code == 400
+        assert client.get(
+            self.url, {'prefix': 'a', 'limit': 'x'}
+        ).status_code == 400
+
+    def test_suggest_from_memory(self, client, create_titles):
+        titles = create_titles(12)
+        response = client.get(self.url, {'prefix': 'произв', 'limit': 5})
+        assert response.status_code == 200
+        assert len(response.json()) == 5
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.url, {'prefix': 'Произведение 1'})
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что подсказки берутся из индекса в памяти'
+        )
+        assert [item['id'] for item in response.json()] == [
+            titles[1].id, titles[10].id, titles[11].id
+        ]
+
+    def test_index_follows_title_changes(self, client, create_titles):
+        title, other = create_titles(2)
+        assert client.get(self.url, {'prefix': 'д'}).json() == []
+        title.name = 'Дюна'
+        title.save()
+        other.delete()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.url, {'prefix': 'д'})
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что индекс обновляется без полной перестройки'
+        )
+        assert response.json() == [{'id': title.id, 'name': 'Дюна'}]
+        assert client.get(self.url, {'prefix': 'произв'}).json() == []
@@ -0,0 +1,44 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(client, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+    )
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    def test_list_query_count(self, client, create_titles):
+        create_titles(2)
+        few = count_queries(client, '/api/v1/titles/')
+        create_titles(15)
+        many = count_queries(client, '/api/v1/titles/')
+        assert few == many, (
+            'Проверьте, что количество запросов к БД при получении списка '
+            'произведений не зависит от количества произведений на странице'
+        )
+
+    def test_retrieve_query_count(self, client, create_titles):
+        title, = create_titles(1)
+        assert count_queries(client, f'/api/v1/titles/{title.pk}/') == 3, (
+            'Проверьте, что категория и жанры произведения загружаются '
+            'без дополнительных запросов к БД'
+        )
+
+
+@pytest.mark.django_db
+def test_title_fields(client, create_titles):
+    title, = create_titles(1)
+    response = client.get(f'/api/v1/titles/{title.pk}/')
+    assert set(response.json()) == {
+        'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+    }, 'Проверьте, что служебные поля произведения не попадают в ответ'
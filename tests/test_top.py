@@ -0,0 +1,59 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def rated_titles(create_titles, django_user_model):
+    from reviews.models import Category, Review, Title
+
+    authors = [
+        django_user_model.objects.create(
+            username=f'critic{number}', email=f'critic{number}@yamdb.fake'
+        )
+        for number in range(20)
+    ]
+    lucky, solid, weak, unrated = create_titles(4)
+    book = Category.objects.create(name='Книга', slug='book')
+    weak.category = book
+    weak.year = 1990
+    weak.save()
+    scores = {lucky: [10], solid: [9] * 20, weak: [3] * 5}
+    Review.objects.bulk_create(
+        Review(title=title, author=author, score=score, text='Отзыв')
+        for title, title_scores in scores.items()
+        for author, score in zip(authors, title_scores)
+    )
+    Title.objects.recalculate_rating()
+    call_command('update_top')
+    return lucky, solid, weak, unrated
+
+
+@pytest.mark.django_db
+class TestTopTitles:
+    url = '/api/v1/titles/top/'
+
+    def get_ids(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == 200
+        return [item['id'] for item in response.json()]
+
+    def test_bayesian_order(self, client, rated_titles):
+        lucky, solid, weak, _ = rated_titles
+        assert self.get_ids(client) == [solid.id, lucky.id, weak.id], (
+            'Проверьте, что единственная высокая оценка не поднимает '
+            'произведение выше стабильно высоко оценённого'
+        )
+        item = client.get(self.url).json()[0]
+        assert item['rating'] == 9
+        assert item['rating_count'] == 20
+        assert 8 < item['weighted_rating'] < 9
+
+    def test_filters(self, client, rated_titles):
+        lucky, solid, weak, _ = rated_titles
+        assert self.get_ids(client, min_reviews=5) == [solid.id, weak.id]
+        assert self.get_ids(client, category='book') == [weak.id]
+        assert self.get_ids(client, year=1990) == [weak.id]
+        assert self.get_ids(client, genre='drama', limit=1) == [solid.id]
+
+    def test_invalid_params(self, client):
+        assert client.get(self.url, {'limit': 'x'}).status_code == 400